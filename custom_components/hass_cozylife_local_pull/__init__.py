@@ -20,6 +20,7 @@ import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 import homeassistant.helpers.config_validation as cv
 
@@ -35,11 +36,14 @@ from .const import (
     DEFAULT_COMMAND_TIMEOUT,
     DEFAULT_RESPONSE_TIMEOUT,
     DEFAULT_SCAN_INTERVAL,
+    RECONNECT_ALL_DELAY,
+    STORAGE_KEY_KNOWN_IPS,
+    STORAGE_VERSION,
 )
 from .coordinator import DeviceCoordinator
-from .discovery import async_discover_devices
+from .discovery import async_discover_devices, async_probe_ips
 from .tcp_client import TcpClient
-from .udp_discover import get_ip
+from .udp_discover import async_get_ip
 from .utils import async_get_pid_list
 
 _LOGGER = logging.getLogger(__name__)
@@ -121,14 +125,20 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
             if not coordinator:
                 continue
 
-            for client in coordinator.devices.values():
+            clients = coordinator.clients
+            for client in clients:
                 _LOGGER.info("Reconnecting %s at %s", client.device_id, client.ip)
-                await client.disconnect()
 
-            await asyncio.sleep(2)
+            # Devices are independent, so one slow device must not hold up the rest
+            await asyncio.gather(
+                *(client.disconnect() for client in clients), return_exceptions=True
+            )
+
+            await asyncio.sleep(RECONNECT_ALL_DELAY)
 
-            for client in coordinator.devices.values():
-                await client.connect(force=True)
+            await asyncio.gather(
+                *(client.connect(force=True) for client in clients), return_exceptions=True
+            )
 
         _LOGGER.info("Reconnect all complete")
 
@@ -152,7 +162,8 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up CozyLife Local from a config entry.
 
     This function:
-    1. Discovers devices via UDP broadcast and hostname scanning
+    1. Probes known device IPs, then discovers devices via UDP broadcast,
+       falling back to hostname scanning
     2. Creates a DeviceCoordinator to manage all devices
     3. Starts persistent connections with automatic reconnection
     4. Sets up background tasks for health checks and re-discovery
@@ -169,19 +180,35 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Ensure domain data is initialized
     hass.data.setdefault(DOMAIN, {})
 
-    # Run UDP and hostname discovery in parallel for faster startup
-    udp_task = hass.async_add_executor_job(get_ip)
-    hostname_task = async_discover_devices(hass)
-    discovery_results = await asyncio.gather(udp_task, hostname_task, return_exceptions=True)
-
-    # Extract results, handling any exceptions
-    ip_udp: list[str] = discovery_results[0] if isinstance(discovery_results[0], list) else []
-    ip_hostname: list[str] = discovery_results[1] if isinstance(discovery_results[1], list) else []
-
-    if isinstance(discovery_results[0], Exception):
-        _LOGGER.warning("UDP discovery failed: %s", discovery_results[0])
-    if isinstance(discovery_results[1], Exception):
-        _LOGGER.warning("Hostname discovery failed: %s", discovery_results[1])
+    # Probe the devices found last time before falling back to a full sweep
+    store: Store[dict[str, list[str]]] = Store(hass, STORAGE_VERSION, STORAGE_KEY_KNOWN_IPS)
+    stored = await store.async_load() or {}
+    known_ips: list[str] = stored.get("ips", [])
+    alive_ips = await async_probe_ips(known_ips) if known_ips else []
+
+    if known_ips and len(alive_ips) == len(known_ips):
+        # Every known device answered; new devices are picked up by the
+        # coordinator's periodic re-discovery
+        _LOGGER.debug("All %d known device(s) responded, skipping discovery", len(alive_ips))
+        ip_udp: list[str] = alive_ips
+        ip_hostname: list[str] = []
+    else:
+        # UDP broadcast is one packet per attempt; the /24 hostname sweep is
+        # 253 reverse lookups, so it only runs when UDP finds nothing
+        try:
+            ip_udp = await async_get_ip(hass)
+        except Exception as e:
+            _LOGGER.warning("UDP discovery failed: %s", e)
+            ip_udp = []
+
+        ip_udp = list(set(ip_udp + alive_ips))
+
+        ip_hostname = []
+        if not ip_udp:
+            try:
+                ip_hostname = await async_discover_devices(hass)
+            except Exception as e:
+                _LOGGER.warning("Hostname discovery failed: %s", e)
 
     # Config IPs (manually specified)
     ip_config_str: str = entry.data.get("ips", "")
@@ -304,6 +331,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         "Found %d valid devices out of %d candidates", len(valid_clients), len(clients)
     )
 
+    # Remember where the devices were for a faster next startup
+    await store.async_save({"ips": [c.ip for c in valid_clients]})
+
     # Start the coordinator (starts persistent connections and background tasks)
     await coordinator.start()
 
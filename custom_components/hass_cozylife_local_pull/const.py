@@ -44,10 +44,17 @@ SATURATION_SCALE = 10  # HA_saturation * 10 = device_saturation
 MIN_COLOR_TEMP_KELVIN = 2000
 MAX_COLOR_TEMP_KELVIN = 6500
 
+# Storage version shared by the integration's Store files
+STORAGE_VERSION = 1
+
 # API configuration
 LANG = "en"
 API_DOMAIN = "api-us.doiting.com"
 
+# The product model list rarely changes, so it is kept on disk between restarts
+STORAGE_KEY_PID_LIST = f"{DOMAIN}_pid_list"
+PID_LIST_CACHE_TTL = 86400  # Refetch the product model list after 24 hours (seconds)
+
 # Connection timeout defaults (in seconds)
 # These can be overridden via config/options flow
 # Increased timeouts for better reliability with slow devices
@@ -71,8 +78,13 @@ INITIAL_RETRY_DELAY = 0.5  # Reduced from 1.0 - faster initial retry
 MAX_RETRY_DELAY = 15.0  # Reduced from 30.0 - don't wait too long
 RETRY_BACKOFF_FACTOR = 1.5  # Reduced from 2.0 - gentler backoff
 
+# Control command batching
+# Control calls within this window are merged into a single CMD_SET frame
+CONTROL_DEBOUNCE_DELAY = 0.02  # seconds
+
 # Periodic reconnection interval (in seconds)
 RECONNECT_INTERVAL = 60  # How often to try reconnecting unavailable devices
+RECONNECT_ALL_DELAY = 2  # Pause between disconnecting and reconnecting in reconnect_all
 
 # Connection health monitoring
 HEALTH_CHECK_INTERVAL = 30  # How often to check connection health (seconds)
@@ -90,6 +102,12 @@ CONF_SCAN_INTERVAL = "scan_interval"
 REDISCOVERY_INTERVAL = 300  # Re-scan network every 5 minutes
 REDISCOVERY_ON_FAILURE_THRESHOLD = 5  # Trigger re-discovery after this many consecutive failures
 
+# Known device IP persistence
+# IPs of devices found on the last setup are stored and probed first, so a
+# full UDP/hostname sweep is only needed when a known device has moved
+STORAGE_KEY_KNOWN_IPS = f"{DOMAIN}_known_ips"
+FAST_PROBE_TIMEOUT = 0.3  # TCP connect timeout when probing a known IP (seconds)
+
 # Application-level heartbeat configuration
 # Heartbeat keeps connections alive and detects dead connections faster than TCP keep-alive
 HEARTBEAT_INTERVAL = 60  # Send heartbeat query every 60 seconds
@@ -134,4 +152,5 @@ SIGNAL_DEVICE_DISCONNECTED = f"{DOMAIN}_device_disconnected"  # Signal when devi
 
 # Cache keys for hass.data
 CACHE_PID_LIST = "pid_list"
+CACHE_PID_LIST_PENDING = "pid_list_pending"  # In-flight pid list load shared by concurrent callers
 CACHE_DEVICE_REGISTRY = "device_registry"  # Maps device_id -> device info including IP
\ No newline at end of file
@@ -32,7 +32,7 @@ from .const import (
 )
 from .tcp_client import TcpClient
 from .discovery import async_discover_devices
-from .udp_discover import get_ip
+from .udp_discover import async_get_ip
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -322,7 +322,7 @@ class DeviceCoordinator:
 
         try:
             # Run UDP and hostname discovery in parallel
-            udp_task = self._hass.async_add_executor_job(get_ip)
+            udp_task = async_get_ip(self._hass)
             hostname_task = async_discover_devices(self._hass)
             results = await asyncio.gather(udp_task, hostname_task, return_exceptions=True)
 
@@ -426,7 +426,7 @@ class DeviceCoordinator:
 
         try:
             # Run discovery
-            udp_task = self._hass.async_add_executor_job(get_ip)
+            udp_task = async_get_ip(self._hass)
             hostname_task = async_discover_devices(self._hass)
             results = await asyncio.gather(udp_task, hostname_task, return_exceptions=True)
 
@@ -4,10 +4,13 @@ from __future__ import annotations
 import asyncio
 import logging
 import socket
+from concurrent.futures import ThreadPoolExecutor
 
 from homeassistant.components.network import async_get_source_ip
 from homeassistant.core import HomeAssistant
 
+from .const import FAST_PROBE_TIMEOUT, TCP_PORT
+
 _LOGGER = logging.getLogger(__name__)
 
 # Discovery configuration
@@ -41,6 +44,13 @@ async def async_discover_devices(hass: HomeAssistant) -> list[str]:
 
     found_ips: list[str] = []
 
+    # Lookups run in a dedicated pool so slow DNS cannot starve Home
+    # Assistant's shared executor; timed out lookups keep their thread until
+    # the resolver gives up, which the pool size bounds
+    dns_pool = ThreadPoolExecutor(
+        max_workers=MAX_CONCURRENT_LOOKUPS, thread_name_prefix="cozylife_dns"
+    )
+
     async def check_ip(ip_addr: str) -> None:
         """Check if IP has CozyLife hostname with timeout."""
         # Skip own IP
@@ -49,9 +59,9 @@ async def async_discover_devices(hass: HomeAssistant) -> list[str]:
 
         try:
             loop = asyncio.get_running_loop()
-            # gethostbyaddr is blocking, run in executor with timeout
+            # gethostbyaddr is blocking, run in the DNS pool with timeout
             host_info = await asyncio.wait_for(
-                loop.run_in_executor(None, socket.gethostbyaddr, ip_addr),
+                loop.run_in_executor(dns_pool, socket.gethostbyaddr, ip_addr),
                 timeout=DNS_LOOKUP_TIMEOUT,
             )
             hostname = host_info[0]
@@ -80,8 +90,46 @@ async def async_discover_devices(hass: HomeAssistant) -> list[str]:
             await check_ip(ip)
 
     _LOGGER.debug("Starting hostname discovery scan on %s.0/24", base_ip)
-    tasks = [sem_check_ip(ip) for ip in ips_to_scan]
-    await asyncio.gather(*tasks, return_exceptions=True)
+    try:
+        tasks = [sem_check_ip(ip) for ip in ips_to_scan]
+        await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        dns_pool.shutdown(wait=False, cancel_futures=True)
 
     _LOGGER.info("Hostname discovery completed: found %d device(s)", len(found_ips))
     return found_ips
+
+
+async def async_probe_ips(ips: list[str]) -> list[str]:
+    """Return the IPs that accept a TCP connection on the device port.
+
+    Used to check previously discovered devices with a single unicast
+    connect each instead of running a full broadcast discovery.
+
+    Args:
+        ips: Candidate device IP addresses.
+
+    Returns:
+        List of IP addresses that responded within FAST_PROBE_TIMEOUT.
+    """
+
+    async def probe(ip_addr: str) -> bool:
+        """Check whether a device is listening at the given IP."""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(ip_addr, TCP_PORT),
+                timeout=FAST_PROBE_TIMEOUT,
+            )
+        except (TimeoutError, OSError):
+            return False
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    results = await asyncio.gather(*(probe(ip) for ip in ips))
+    alive = [ip for ip, ok in zip(ips, results) if ok]
+    _LOGGER.debug("Probed %d known IP(s), %d responded", len(ips), len(alive))
+    return alive
@@ -35,10 +35,34 @@ from .tcp_client import TcpClient
 
 _LOGGER = logging.getLogger(__name__)
 
+# Device brightness and color temperature use a 0-1000 scale
+_DEVICE_SCALE = 1000
+_KELVIN_RANGE = MAX_COLOR_TEMP_KELVIN - MIN_COLOR_TEMP_KELVIN
+
+# Feature detection bits, one per data point ID
+_COLOR_TEMP_MASK = 1 << int(DPID_TEMP)
+_HS_MASK = (1 << int(DPID_HUE)) | (1 << int(DPID_SAT))
+
 # Will be set dynamically based on config
 SCAN_INTERVAL = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
 
 
+def _dpid_mask(dpid: list[str]) -> int:
+    """Fold a device's data point IDs into a bitmask.
+
+    Args:
+        dpid: The data point IDs reported for the device.
+
+    Returns:
+        An integer with bit N set for every numeric data point ID N.
+    """
+    mask = 0
+    for item in dpid:
+        if item.isdigit():
+            mask |= 1 << int(item)
+    return mask
+
+
 async def async_setup_entry(
     hass: HomeAssistant,
     config_entry: ConfigEntry,
@@ -85,6 +109,10 @@ class CozyLifeLight(CozyLifeEntity, LightEntity):
         self._attr_supported_color_modes: set[ColorMode] = {ColorMode.BRIGHTNESS}
         self._attr_color_mode: ColorMode = ColorMode.BRIGHTNESS
 
+        # Bitmask of the client's dpid list, rebuilt only when the list changes
+        self._dpid_mask: int = 0
+        self._dpid_mask_source: list[str] | None = None
+
     def _get_default_model(self) -> str:
         """Return the default model name for lights."""
         return "Light"
@@ -107,11 +135,17 @@ class CozyLifeLight(CozyLifeEntity, LightEntity):
             dpid,
         )
 
+        # The client replaces its dpid list rather than mutating it, so an
+        # identity check is enough to tell whether the mask is stale
+        if dpid is not self._dpid_mask_source:
+            self._dpid_mask = _dpid_mask(dpid)
+            self._dpid_mask_source = dpid
+        mask = self._dpid_mask
         supported: set[ColorMode] = {ColorMode.BRIGHTNESS}
-        if DPID_TEMP in dpid:
+        if mask & _COLOR_TEMP_MASK:
             supported.add(ColorMode.COLOR_TEMP)
 
-        if DPID_HUE in dpid or DPID_SAT in dpid:
+        if mask & _HS_MASK:
             supported.add(ColorMode.HS)
 
         # Clean up supported modes - HS and COLOR_TEMP imply brightness
@@ -146,9 +180,11 @@ class CozyLifeLight(CozyLifeEntity, LightEntity):
 
         if DPID_BRIGHT in self._state:
             # Device uses 0-1000, HA uses 0-255
-            # Use proper rounding for accurate mapping
+            # Integer math, rounding half up
             device_brightness = self._state[DPID_BRIGHT]
-            self._attr_brightness = min(round(device_brightness * 255 / 1000), 255)
+            self._attr_brightness = min(
+                (device_brightness * 255 + _DEVICE_SCALE // 2) // _DEVICE_SCALE, 255
+            )
 
         if DPID_HUE in self._state and DPID_SAT in self._state:
             self._attr_hs_color = (
@@ -161,9 +197,7 @@ class CozyLifeLight(CozyLifeEntity, LightEntity):
             # 0 = warmest (2000K), 1000 = coolest (6500K)
             # Linear interpolation: kelvin = MIN + (value / 1000) * (MAX - MIN)
             device_temp = self._state[DPID_TEMP]
-            kelvin = MIN_COLOR_TEMP_KELVIN + int(
-                device_temp * (MAX_COLOR_TEMP_KELVIN - MIN_COLOR_TEMP_KELVIN) / 1000
-            )
+            kelvin = MIN_COLOR_TEMP_KELVIN + device_temp * _KELVIN_RANGE // _DEVICE_SCALE
             # Clamp to valid range
             self._attr_color_temp_kelvin = max(
                 MIN_COLOR_TEMP_KELVIN, min(MAX_COLOR_TEMP_KELVIN, kelvin)
@@ -187,7 +221,7 @@ class CozyLifeLight(CozyLifeEntity, LightEntity):
         if brightness is not None:
             # Clamp to valid range (0-1000) to prevent overflow
             # brightness is 0-255, device expects 0-1000
-            device_brightness = min(int(brightness * 1000 / 255), 1000)
+            device_brightness = min(brightness * _DEVICE_SCALE // 255, _DEVICE_SCALE)
             payload[DPID_BRIGHT] = device_brightness
 
         if hs_color is not None:
@@ -201,12 +235,8 @@ class CozyLifeLight(CozyLifeEntity, LightEntity):
             clamped_kelvin = max(
                 MIN_COLOR_TEMP_KELVIN, min(MAX_COLOR_TEMP_KELVIN, colortemp_kelvin)
             )
-            val = int(
-                (clamped_kelvin - MIN_COLOR_TEMP_KELVIN)
-                * 1000
-                / (MAX_COLOR_TEMP_KELVIN - MIN_COLOR_TEMP_KELVIN)
-            )
-            payload[DPID_TEMP] = max(0, min(1000, val))
+            val = (clamped_kelvin - MIN_COLOR_TEMP_KELVIN) * _DEVICE_SCALE // _KELVIN_RANGE
+            payload[DPID_TEMP] = max(0, min(_DEVICE_SCALE, val))
 
         # Send control command
         success = await self._async_send_command(payload)
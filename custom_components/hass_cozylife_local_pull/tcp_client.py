@@ -10,6 +10,8 @@ import time
 from dataclasses import dataclass, field
 from typing import Any, Callable, TYPE_CHECKING
 
+from homeassistant.helpers.json import json_bytes
+
 from .const import (
     DOMAIN,
     TCP_PORT,
@@ -42,6 +44,7 @@ from .const import (
     CONFIGURED_DEVICE_MIN_RETRY,
     CONFIGURED_DEVICE_MAX_RETRY,
     CONFIGURED_DEVICE_IMMEDIATE_RETRY,
+    CONTROL_DEBOUNCE_DELAY,
 )
 from .utils import async_get_pid_list, get_sn
 
@@ -53,6 +56,22 @@ CMD_INFO: int = 0
 CMD_QUERY: int = 2
 CMD_SET: int = 3
 
+# Frame terminator appended to every package
+_PACKAGE_TERMINATOR: bytes = b"\r\n"
+
+# Pre-encoded CMD_QUERY frame around the serial number. The query envelope
+# never changes, so the hot polling path skips dict building and json.dumps.
+_QUERY_PACKAGE_PREFIX: bytes = b'{"pv":0,"cmd":2,"sn":"'
+_QUERY_PACKAGE_SUFFIX: bytes = b'","msg":{"attr":[0]}}' + _PACKAGE_TERMINATOR
+
+# CMD_INFO is just as static; CMD_SET only serializes its attr/data values
+_INFO_PACKAGE_PREFIX: bytes = b'{"pv":0,"cmd":0,"sn":"'
+_INFO_PACKAGE_SUFFIX: bytes = b'","msg":{}}' + _PACKAGE_TERMINATOR
+_SET_PACKAGE_PREFIX: bytes = b'{"pv":0,"cmd":3,"sn":"'
+_SET_PACKAGE_ATTR: bytes = b'","msg":{"attr":'
+_SET_PACKAGE_DATA: bytes = b',"data":'
+_SET_PACKAGE_SUFFIX: bytes = b"}}" + _PACKAGE_TERMINATOR
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -103,7 +122,7 @@ class TcpClient:
         self._writer: asyncio.StreamWriter | None = None
         self._lock: asyncio.Lock = asyncio.Lock()
         self._available: bool = False
-        self._read_buffer: str = ""  # Buffer for partial responses
+        self._read_buffer: bytes = b""  # Buffer for partial responses
 
         # Configurable timeouts with defaults
         self._connection_timeout: float = connection_timeout or DEFAULT_CONNECTION_TIMEOUT
@@ -112,6 +131,7 @@ class TcpClient:
 
         # Device info
         self._info: DeviceInfo = DeviceInfo()
+        self._info_cached: bool = False  # Skip CMD_INFO on reconnect once known
         self._sn: str = ""
         self._last_error: str | None = None
 
@@ -146,6 +166,13 @@ class TcpClient:
         self._is_configured: bool = is_configured
         self._first_failure_after_success: bool = True  # Track if this is first failure
 
+        # Control batching - payloads merged into one CMD_SET per debounce window
+        self._pending_payload: dict[str, Any] = {}
+        self._pending_control: asyncio.Future[bool] | None = None
+
+        # Query coalescing - concurrent callers share one in-flight CMD_QUERY
+        self._pending_query: asyncio.Future[dict[str, Any]] | None = None
+
     async def connect(self, force: bool = False) -> bool:
         """Establish connection to device with improved error handling.
 
@@ -200,8 +227,10 @@ class TcpClient:
                 # Enable TCP keep-alive to detect dead connections
                 self._configure_socket_keepalive()
 
-                # Get device info with timeout
-                await asyncio.wait_for(self._device_info(), timeout=self._connection_timeout)
+                # Device info never changes, so only reconnects to an unknown
+                # device pay for the CMD_INFO round-trip
+                if not self._info_cached:
+                    await asyncio.wait_for(self._device_info(), timeout=self._connection_timeout)
 
                 # If dpid is still empty, try to query to get attributes
                 if not self._info.dpid:
@@ -356,7 +385,7 @@ class TcpClient:
             finally:
                 self._writer = None
                 self._reader = None
-        self._read_buffer = ""  # Clear buffer on disconnect
+        self._read_buffer = b""  # Clear buffer on disconnect
         # Note: Don't set _available = False here - let failure tracking handle it
 
     async def disconnect(self) -> None:
@@ -602,28 +631,33 @@ class TcpClient:
 
         if msg.get("pid") is None:
             _LOGGER.debug("_device_info: Missing PID for %s, using dtp if available", self._ip)
-            # Don't return - we might still have dtp
+            # Don't return - we might still have dtp. Nothing more to look up.
+            self._info_cached = True
         else:
             self._info.pid = msg["pid"]
 
             # Try to look up device info from PID list
             pid_list = await async_get_pid_list(self._hass)
 
-            for item in pid_list:
-                match = False
-                for model in item.get("m", []):
-                    if model.get("pid") == self._info.pid:
-                        match = True
-                        self._info.icon = model.get("i", "")
-                        self._info.device_model_name = model.get("n", "")
-                        self._info.dpid = [str(x) for x in model.get("dpid", [])]
-                        break
-
-                if match:
-                    # Only override device_type_code if not already set from dtp
-                    if not self._info.device_type_code:
-                        self._info.device_type_code = item.get("c", "")
-                    break
+            entry = next(
+                (
+                    (item, model)
+                    for item in pid_list
+                    for model in item.get("m", [])
+                    if model.get("pid") == self._info.pid
+                ),
+                None,
+            )
+            if entry is not None:
+                item, model = entry
+                self._info.icon = model.get("i", "")
+                self._info.device_model_name = model.get("n", "")
+                self._info.dpid = [str(x) for x in model.get("dpid", [])]
+                # Only override device_type_code if not already set from dtp
+                if not self._info.device_type_code:
+                    self._info.device_type_code = item.get("c", "")
+                self._info_cached = True
+            # Otherwise (e.g. API unreachable) retry the lookup on reconnect
 
         # If we still don't have device_type_code, try to infer from dpid
         if not self._info.device_type_code and self._info.dpid:
@@ -660,37 +694,28 @@ class TcpClient:
             ValueError: If the command type is invalid.
         """
         self._sn = get_sn()
+        sn = self._sn.encode()
+
+        if cmd == CMD_QUERY:
+            return _QUERY_PACKAGE_PREFIX + sn + _QUERY_PACKAGE_SUFFIX
 
         if cmd == CMD_SET:
-            message = {
-                "pv": 0,
-                "cmd": cmd,
-                "sn": self._sn,
-                "msg": {
-                    "attr": [int(item) for item in payload.keys()],
-                    "data": payload,
-                },
-            }
-        elif cmd == CMD_QUERY:
-            message = {
-                "pv": 0,
-                "cmd": cmd,
-                "sn": self._sn,
-                "msg": {"attr": [0]},
-            }
+            package = b"".join((
+                _SET_PACKAGE_PREFIX,
+                sn,
+                _SET_PACKAGE_ATTR,
+                json_bytes([int(item) for item in payload]),
+                _SET_PACKAGE_DATA,
+                json_bytes(payload),
+                _SET_PACKAGE_SUFFIX,
+            ))
         elif cmd == CMD_INFO:
-            message = {
-                "pv": 0,
-                "cmd": cmd,
-                "sn": self._sn,
-                "msg": {},
-            }
+            package = _INFO_PACKAGE_PREFIX + sn + _INFO_PACKAGE_SUFFIX
         else:
             raise ValueError(f"Invalid command type: {cmd}")
 
-        payload_str = json.dumps(message, separators=(",", ":"))
-        _LOGGER.debug("_package=%s", payload_str)
-        return (payload_str + "\r\n").encode("utf-8")
+        _LOGGER.debug("_package=%r", package)
+        return package
 
     async def _send_receiver(self, cmd: int, payload: dict[str, Any]) -> dict[str, Any]:
         """Send command and wait for response with improved reliability.
@@ -705,28 +730,23 @@ class TcpClient:
         async with self._lock:
             return await self._send_receiver_internal(cmd, payload)
 
-    def _parse_json_lines(self, data: str, target_sn: str) -> dict[str, Any] | None:
+    def _parse_json_lines(self, data: bytes, target_sn: bytes) -> dict[str, Any] | None:
         """Parse newline-delimited JSON and find the response matching our SN.
 
         CozyLife devices send responses as newline-delimited JSON. A single read
-        may contain multiple JSON objects or partial data. This method properly
-        handles splitting on newlines and finding the matching response.
+        may contain multiple JSON objects or partial data. This method works on
+        the raw bytes and only decodes lines that contain our serial number, so
+        unrelated push notifications are never parsed.
 
         Args:
-            data: Raw string data that may contain multiple JSON objects.
-            target_sn: The serial number we're looking for.
+            data: Raw bytes that may contain multiple JSON objects.
+            target_sn: The serial number we're looking for, encoded as bytes.
 
         Returns:
             The parsed JSON object matching our SN, or None if not found.
         """
-        # Split on common line delimiters (device uses \r\n but handle both)
-        lines = data.replace("\r\n", "\n").replace("\r", "\n").split("\n")
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
+        # splitlines() handles \r\n, \n and \r (device uses \r\n)
+        for line in data.splitlines():
             # Quick check if our SN is in this line before parsing
             if target_sn not in line:
                 continue
@@ -735,7 +755,7 @@ class TcpClient:
                 parsed = json.loads(line)
                 if isinstance(parsed, dict):
                     return parsed
-            except json.JSONDecodeError:
+            except ValueError:
                 # This line is not valid JSON, skip it
                 _LOGGER.debug(
                     "Skipping invalid JSON line from %s (length: %d)",
@@ -760,32 +780,50 @@ class TcpClient:
         Returns:
             The response data dictionary, or empty dict on failure.
         """
-        # Check connection and reconnect if needed
+        # Check connection and reconnect if needed. In persistent mode the
+        # receive loop owns reconnection, so fail fast instead of paying the
+        # connect + CMD_INFO cost on the caller's critical path.
         if not self.is_connected():
+            if self._is_persistent_mode():
+                _LOGGER.debug("Not connected to %s, receive loop will reconnect", self._ip)
+                return {}
             _LOGGER.debug("Connection lost to %s, reconnecting...", self._ip)
             if not await self._connect_internal():
                 return {}
 
+        # Queries are immediately followed by a read bounded by the response
+        # timeout, so skip the extra drain() hop; backpressure still applies
+        # on the next write.
+        needs_drain = cmd != CMD_QUERY
+
         # Try to send, reconnecting once if it fails
         try:
             _LOGGER.debug("Sending command %d to %s with payload %s", cmd, self._ip, payload)
             self._writer.write(self._get_package(cmd, payload))
-            await asyncio.wait_for(self._writer.drain(), timeout=self._command_timeout)
+            if needs_drain:
+                await asyncio.wait_for(self._writer.drain(), timeout=self._command_timeout)
         except Exception as send_error:
-            _LOGGER.debug("Send failed to %s: %s, reconnecting and retrying...", self._ip, send_error)
             await self._close_connection()
+            if self._is_persistent_mode():
+                _LOGGER.debug("Send failed to %s: %s, receive loop will reconnect", self._ip, send_error)
+                self._mark_communication_failure(str(send_error))
+                return {}
+            _LOGGER.debug("Send failed to %s: %s, reconnecting and retrying...", self._ip, send_error)
             if not await self._connect_internal():
                 return {}
             # Retry send after reconnect
             try:
                 self._writer.write(self._get_package(cmd, payload))
-                await asyncio.wait_for(self._writer.drain(), timeout=self._command_timeout)
+                if needs_drain:
+                    await asyncio.wait_for(self._writer.drain(), timeout=self._command_timeout)
             except Exception as retry_error:
                 _LOGGER.warning("Send retry failed to %s: %s", self._ip, retry_error)
                 self._mark_communication_failure(str(retry_error))
                 await self._close_connection()
                 return {}
 
+        sn_bytes = self._sn.encode()
+
         try:
 
             # Wait for response with retry logic for timeouts
@@ -800,19 +838,18 @@ class TcpClient:
                         await self._close_connection()
                         return {}
 
-                    res_str = res.decode("utf-8", errors="ignore")
-                    _LOGGER.debug("Received from %s: %s", self._ip, res_str.replace(chr(10), '\\n').replace(chr(13), '\\r'))
+                    _LOGGER.debug("Received from %s: %r", self._ip, res)
 
                     # Add to buffer for handling partial responses
-                    self._read_buffer += res_str
+                    self._read_buffer += res
 
                     # Check if response contains our serial number
-                    if self._sn in self._read_buffer:
+                    if sn_bytes in self._read_buffer:
                         # Parse newline-delimited JSON to find our response
-                        response_payload = self._parse_json_lines(self._read_buffer, self._sn)
+                        response_payload = self._parse_json_lines(self._read_buffer, sn_bytes)
 
                         # Clear buffer after successful parse
-                        self._read_buffer = ""
+                        self._read_buffer = b""
 
                         if not response_payload:
                             _LOGGER.debug("No valid JSON with our SN found from %s", self._ip)
@@ -851,7 +888,7 @@ class TcpClient:
                         MAX_RETRY_ATTEMPTS,
                     )
                     # Clear buffer on timeout
-                    self._read_buffer = ""
+                    self._read_buffer = b""
                     # Only mark failure on final attempt
                     if attempt == MAX_RETRY_ATTEMPTS - 1:
                         self._mark_communication_failure("Response timeout")
@@ -859,14 +896,14 @@ class TcpClient:
                     continue
 
             # All retry attempts exhausted
-            self._read_buffer = ""  # Clear buffer
+            self._read_buffer = b""  # Clear buffer
             _LOGGER.debug("No valid response received from %s after %d attempts", self._ip, MAX_RETRY_ATTEMPTS)
             self._mark_communication_failure("No valid response")
             return {}
 
         except Exception as e:
             _LOGGER.warning("_send_receiver error for %s: %s", self._ip, e)
-            self._read_buffer = ""  # Clear buffer on error
+            self._read_buffer = b""  # Clear buffer on error
             self._mark_communication_failure(str(e))
             await self._close_connection()
             return {}
@@ -897,6 +934,44 @@ class TcpClient:
     async def control(self, payload: dict[str, Any]) -> bool:
         """Send control command.
 
+        Control calls arriving within CONTROL_DEBOUNCE_DELAY of each other are
+        merged into a single CMD_SET frame (later values win), so adjusting
+        several attributes at once costs one round-trip instead of one each.
+        All merged callers receive the result of the shared send.
+
+        Args:
+            payload: The control payload to send.
+
+        Returns:
+            True if command was sent successfully, False otherwise.
+        """
+        self._pending_payload.update(payload)
+
+        if self._pending_control is not None:
+            # A batch is already open - ride along with it
+            return await asyncio.shield(self._pending_control)
+
+        batch: asyncio.Future[bool] = asyncio.get_running_loop().create_future()
+        self._pending_control = batch
+        result = False
+        try:
+            await asyncio.sleep(CONTROL_DEBOUNCE_DELAY)
+            merged = self._pending_payload
+            self._pending_payload = {}
+            self._pending_control = None
+            result = await self._send_control(merged)
+            return result
+        finally:
+            if self._pending_control is batch:
+                # Cancelled before the batch was flushed
+                self._pending_control = None
+                self._pending_payload = {}
+            if not batch.done():
+                batch.set_result(result)
+
+    async def _send_control(self, payload: dict[str, Any]) -> bool:
+        """Send a CMD_SET frame to the device.
+
         When persistent connection is active, this just sends the command
         without waiting for response (the receive loop handles responses).
         Otherwise, waits for acknowledgment.
@@ -908,14 +983,19 @@ class TcpClient:
             True if command was sent successfully, False otherwise.
         """
         # Check if persistent connection is active
-        persistent_mode = (
-            self._receive_loop_task is not None
-            and not self._receive_loop_task.done()
-        )
+        persistent_mode = self._is_persistent_mode()
 
         async with self._lock:
             # Check connection and reconnect if needed
             if not self.is_connected():
+                if persistent_mode:
+                    # The receive loop reconnects in the background; the next
+                    # command will find a warm connection.
+                    _LOGGER.debug(
+                        "Not connected to %s, dropping control (receive loop will reconnect)",
+                        self._ip,
+                    )
+                    return False
                 _LOGGER.debug("Connection lost to %s, reconnecting for control...", self._ip)
                 if not await self._connect_internal():
                     return False
@@ -926,8 +1006,16 @@ class TcpClient:
                 self._writer.write(self._get_package(CMD_SET, payload))
                 await asyncio.wait_for(self._writer.drain(), timeout=self._command_timeout)
             except Exception as send_error:
-                _LOGGER.debug("Control send failed to %s: %s, reconnecting and retrying...", self._ip, send_error)
                 await self._close_connection()
+                if persistent_mode:
+                    _LOGGER.debug(
+                        "Control send failed to %s: %s, receive loop will reconnect",
+                        self._ip,
+                        send_error,
+                    )
+                    self._mark_communication_failure(str(send_error))
+                    return False
+                _LOGGER.debug("Control send failed to %s: %s, reconnecting and retrying...", self._ip, send_error)
                 if not await self._connect_internal():
                     return False
                 # Retry send after reconnect
@@ -946,22 +1034,17 @@ class TcpClient:
                 self._last_activity = time.monotonic()
                 return True
 
-            # Non-persistent mode: wait for acknowledgment
+            # Non-persistent mode: wait for acknowledgment. asyncio.timeout()
+            # bounds the read in place instead of wrapping it in a task.
             try:
-                res = await asyncio.wait_for(
-                    self._reader.read(1024), timeout=self._response_timeout
-                )
+                async with asyncio.timeout(self._response_timeout):
+                    res = await self._reader.read(1024)
                 if res:
-                    res_str = res.decode("utf-8", errors="ignore")
-                    _LOGGER.debug(
-                        "Control response from %s: %s",
-                        self._ip,
-                        res_str.replace(chr(10), '\\n').replace(chr(13), '\\r')
-                    )
+                    _LOGGER.debug("Control response from %s: %r", self._ip, res)
 
                     # Parse newline-delimited JSON to find our response
                     # Device may send multiple JSON objects in one response
-                    response_payload = self._parse_json_lines(res_str, self._sn)
+                    response_payload = self._parse_json_lines(res, self._sn.encode())
 
                     if response_payload:
                         # Found our response
@@ -999,20 +1082,36 @@ class TcpClient:
 
         When persistent connection is active, returns cached state to avoid
         conflicts with the receive loop. Otherwise, performs direct query.
+        Callers arriving while a query is in flight (entity polls, post-command
+        refreshes, heartbeats) share its result instead of queueing their own
+        round-trip behind the lock.
 
         Returns:
             The device state dictionary, or empty dict on failure.
         """
         # If persistent connection is running, use cached state
         # The receive loop keeps it updated via push notifications
-        if self._receive_loop_task is not None and not self._receive_loop_task.done():
+        if self._is_persistent_mode():
             if self._last_state:
                 _LOGGER.debug("Using cached state for %s: %s", self._ip, self._last_state)
                 return self._last_state.copy()
             # No cached state yet, fall through to direct query
             _LOGGER.debug("No cached state for %s, doing direct query", self._ip)
 
-        return await self._send_receiver(CMD_QUERY, {})
+        if self._pending_query is not None:
+            # Copy so callers updating their state in place stay independent
+            return dict(await asyncio.shield(self._pending_query))
+
+        pending: asyncio.Future[dict[str, Any]] = asyncio.get_running_loop().create_future()
+        self._pending_query = pending
+        result: dict[str, Any] = {}
+        try:
+            result = await self._send_receiver(CMD_QUERY, {})
+            return result
+        finally:
+            self._pending_query = None
+            if not pending.done():
+                pending.set_result(result)
 
     async def _query_internal(self) -> dict[str, Any]:
         """Internal query without lock (to avoid deadlock).
@@ -1189,6 +1288,14 @@ class TcpClient:
                 new_state,
             )
 
+    def _is_persistent_mode(self) -> bool:
+        """Check if the background receive loop is managing the connection.
+
+        Returns:
+            True if the receive loop task is running.
+        """
+        return self._receive_loop_task is not None and not self._receive_loop_task.done()
+
     def _calculate_reconnect_delay(self) -> float:
         """Calculate the delay before next reconnection attempt.
 
@@ -1261,7 +1368,7 @@ class TcpClient:
             _LOGGER.debug("Cannot start persistent connection for %s: closing", self._ip)
             return
 
-        if self._receive_loop_task is not None and not self._receive_loop_task.done():
+        if self._is_persistent_mode():
             _LOGGER.debug("Receive loop already running for %s", self._ip)
             return
 
@@ -1459,7 +1566,7 @@ class TcpClient:
             True if heartbeat succeeded.
         """
         try:
-            if not self._writer or self._writer.is_closing():
+            if not self.is_connected():
                 return False
 
             # Send a query command
@@ -1495,6 +1602,9 @@ class TcpClient:
             new_ip,
         )
 
+        # Re-read device info so the device at the new address is verified
+        self._info_cached = False
+
         # Reset retry state for fresh connection attempt
         self._retry_count = 0
         self._next_retry_time = 0.0
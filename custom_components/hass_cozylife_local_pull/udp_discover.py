@@ -1,12 +1,13 @@
 """UDP device discovery for CozyLife devices."""
 from __future__ import annotations
 
-import contextlib
-import json
+import asyncio
 import logging
-import socket
 import time
 
+from homeassistant.components.network import async_get_ipv4_broadcast_addresses
+from homeassistant.core import HomeAssistant
+
 from .const import UDP_DISCOVERY_PORT
 from .utils import get_sn
 
@@ -18,31 +19,11 @@ _LOGGER = logging.getLogger(__name__)
 BROADCAST_ADDRESS = "255.255.255.255"
 BROADCAST_ATTEMPTS = 8  # Increased from 5 - more chances for devices to hear us
 BROADCAST_DELAY = 0.2  # Increased from 0.1 - give devices more time to process
-SOCKET_TIMEOUT = 1.0  # Increased from 0.5 - longer wait for slow devices
-MAX_FIRST_RESPONSE_TRIES = 15  # Increased from 10 - wait longer for first response
-MAX_RECEIVE_ATTEMPTS = 150  # Increased from 100 - collect more responses
-MAX_CONSECUTIVE_TIMEOUTS = 5  # Increased from 3 - be more patient
-
-
-@contextlib.contextmanager
-def _create_udp_socket(timeout: float = SOCKET_TIMEOUT):
-    """Create and configure a UDP broadcast socket.
-
-    Args:
-        timeout: Socket timeout in seconds.
+RESPONSE_COLLECT_WINDOW = 2.0  # Time to keep listening after the last broadcast
 
-    Yields:
-        Configured UDP socket.
-    """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
-    try:
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        sock.settimeout(timeout)
-        yield sock
-    finally:
-        sock.close()
-        _LOGGER.debug("UDP socket closed")
+# Fixed parts of the discovery message; only the sn changes between runs
+_DISCOVERY_MESSAGE_PREFIX = b'{"cmd":0,"pv":0,"sn":"'
+_DISCOVERY_MESSAGE_SUFFIX = b'","msg":{}}'
 
 
 def _build_discovery_message() -> bytes:
@@ -51,117 +32,104 @@ def _build_discovery_message() -> bytes:
     Returns:
         Encoded discovery message as bytes.
     """
-    message = {
-        "cmd": 0,
-        "pv": 0,
-        "sn": get_sn(),
-        "msg": {},
-    }
-    return json.dumps(message, separators=(",", ":")).encode("utf-8")
-
-
-def get_ip() -> list[str]:
-    """Discover CozyLife device IPs via UDP broadcast.
+    return _DISCOVERY_MESSAGE_PREFIX + get_sn().encode() + _DISCOVERY_MESSAGE_SUFFIX
 
-    Sends UDP broadcast messages and collects responses from CozyLife devices
-    on the local network.
-
-    Returns:
-        List of discovered device IP addresses.
-    """
-    try:
-        with _create_udp_socket() as sock:
-            return _discover_devices(sock)
-    except Exception as e:
-        _LOGGER.error("UDP discovery failed with error: %s", e)
-        return []
 
+async def _async_get_broadcast_addresses(hass: HomeAssistant | None) -> list[str]:
+    """Return the broadcast addresses discovery should be sent to.
 
-def _discover_devices(sock: socket.socket) -> list[str]:
-    """Perform device discovery on the given socket.
+    The limited broadcast address is only routed out of one interface on
+    many Linux hosts, so the directed broadcast address of every enabled
+    IPv4 adapter is added when Home Assistant's network info is available.
 
     Args:
-        sock: Configured UDP socket.
+        hass: The Home Assistant instance, or None to use only the limited
+            broadcast address.
 
     Returns:
-        List of discovered device IP addresses.
+        Sorted list of broadcast addresses.
     """
-    message = _build_discovery_message()
-
-    # Send discovery broadcast multiple times with delays
-    _LOGGER.debug("Starting UDP discovery broadcast")
-    for i in range(BROADCAST_ATTEMPTS):
+    addresses = {BROADCAST_ADDRESS}
+    if hass is not None:
         try:
-            sock.sendto(message, (BROADCAST_ADDRESS, UDP_DISCOVERY_PORT))
-            _LOGGER.debug("Sent UDP broadcast %d/%d", i + 1, BROADCAST_ATTEMPTS)
-            time.sleep(BROADCAST_DELAY)
+            addresses.update(
+                str(address)
+                for address in await async_get_ipv4_broadcast_addresses(hass)
+            )
         except Exception as e:
-            _LOGGER.warning("Failed to send UDP broadcast %d: %s", i + 1, e)
+            _LOGGER.debug("Could not get interface broadcast addresses: %s", e)
+    return sorted(addresses)
 
-    # Give devices a moment to prepare responses after last broadcast
-    time.sleep(0.5)
 
-    # Wait for first response
-    if not _wait_for_first_response(sock):
-        _LOGGER.info("UDP discovery found no devices after waiting")
-        return []
+class _DiscoveryProtocol(asyncio.DatagramProtocol):
+    """Datagram protocol collecting the source IPs of discovery responses."""
 
-    # Collect all responses
-    discovered_ips = _collect_responses(sock)
-    _LOGGER.info("UDP discovery completed: found %d device(s)", len(discovered_ips))
-    return discovered_ips
+    def __init__(self) -> None:
+        """Initialize the protocol."""
+        self.ips: set[str] = set()
 
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Record the sender of a discovery response."""
+        ip = addr[0]
+        if ip not in self.ips:
+            self.ips.add(ip)
+            _LOGGER.info("UDP discovered device at: %s", ip)
 
-def _wait_for_first_response(sock: socket.socket) -> bool:
-    """Wait for the first UDP response.
-
-    Args:
-        sock: Configured UDP socket.
+    def error_received(self, exc: Exception) -> None:
+        """Log socket errors reported by the transport."""
+        _LOGGER.debug("UDP receive error: %s", exc)
 
-    Returns:
-        True if a response was received, False otherwise.
-    """
-    for i in range(MAX_FIRST_RESPONSE_TRIES):
-        try:
-            _, addr = sock.recvfrom(1024, socket.MSG_PEEK)
-            _LOGGER.debug("First UDP response from: %s", addr[0])
-            return True
-        except socket.timeout:
-            _LOGGER.debug("%d/%d try, waiting for first response...", i + 1, MAX_FIRST_RESPONSE_TRIES)
-        except Exception as err:
-            _LOGGER.debug("UDP receive error: %s", err)
-    return False
 
+async def async_get_ip(hass: HomeAssistant | None = None) -> list[str]:
+    """Discover CozyLife device IPs via UDP broadcast without blocking the loop.
 
-def _collect_responses(sock: socket.socket) -> list[str]:
-    """Collect all UDP responses from devices.
+    Responses are collected by a datagram protocol while the broadcasts are
+    still being sent, so sending and receiving overlap.
 
     Args:
-        sock: Configured UDP socket.
+        hass: The Home Assistant instance, used to broadcast on every
+            interface of multi-homed hosts (optional).
 
     Returns:
-        List of unique device IP addresses.
+        List of discovered device IP addresses.
     """
-    ips: list[str] = []
-    attempts = 0
-    consecutive_timeouts = 0
+    loop = asyncio.get_running_loop()
+    started = time.monotonic()
+    try:
+        transport, protocol = await loop.create_datagram_endpoint(
+            _DiscoveryProtocol,
+            local_addr=("0.0.0.0", 0),
+            allow_broadcast=True,
+        )
+    except OSError as e:
+        _LOGGER.error("UDP discovery failed with error: %s", e)
+        return []
 
-    while attempts < MAX_RECEIVE_ATTEMPTS and consecutive_timeouts < MAX_CONSECUTIVE_TIMEOUTS:
-        try:
-            _, addr = sock.recvfrom(1024)
-            ip = addr[0]
-            if ip not in ips:
-                ips.append(ip)
-                _LOGGER.info("UDP discovered device at: %s", ip)
-            consecutive_timeouts = 0
-        except socket.timeout:
-            consecutive_timeouts += 1
-            _LOGGER.debug(
-                "UDP timeout (%d/%d)", consecutive_timeouts, MAX_CONSECUTIVE_TIMEOUTS
-            )
-        except Exception as e:
-            _LOGGER.debug("UDP receive error: %s", e)
-            break
-        attempts += 1
+    try:
+        message = _build_discovery_message()
+        broadcast_addresses = await _async_get_broadcast_addresses(hass)
+
+        _LOGGER.debug("Starting UDP discovery broadcast to %s", broadcast_addresses)
+        for i in range(BROADCAST_ATTEMPTS):
+            for address in broadcast_addresses:
+                try:
+                    transport.sendto(message, (address, UDP_DISCOVERY_PORT))
+                except Exception as e:
+                    _LOGGER.warning(
+                        "Failed to send UDP broadcast %d to %s: %s", i + 1, address, e
+                    )
+            _LOGGER.debug("Sent UDP broadcast %d/%d", i + 1, BROADCAST_ATTEMPTS)
+            await asyncio.sleep(BROADCAST_DELAY)
 
-    return ips
+        # Keep listening for late responders
+        await asyncio.sleep(RESPONSE_COLLECT_WINDOW)
+    finally:
+        transport.close()
+
+    discovered_ips = list(protocol.ips)
+    _LOGGER.info(
+        "UDP discovery completed: found %d device(s) in %.2fs",
+        len(discovered_ips),
+        time.monotonic() - started,
+    )
+    return discovered_ips
@@ -2,17 +2,25 @@
 """Utility functions for CozyLife integration."""
 from __future__ import annotations
 
-import json
+import asyncio
 import time
 import aiohttp
 import logging
 from typing import Any, TYPE_CHECKING
 
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import Store
+from homeassistant.util.json import json_loads
+
 from .const import (
     API_DOMAIN,
     DOMAIN,
     LANG,
     CACHE_PID_LIST,
+    CACHE_PID_LIST_PENDING,
+    PID_LIST_CACHE_TTL,
+    STORAGE_KEY_PID_LIST,
+    STORAGE_VERSION,
 )
 
 if TYPE_CHECKING:
@@ -22,6 +30,7 @@ _LOGGER = logging.getLogger(__name__)
 
 # Supported languages for the API
 SUPPORTED_LANGUAGES = frozenset(["zh", "en", "es", "pt", "ja", "ru", "nl", "ko", "fr", "de"])
+_LANG_MAP = {lang: lang for lang in SUPPORTED_LANGUAGES}
 
 
 def get_sn() -> str:
@@ -30,7 +39,33 @@ def get_sn() -> str:
     Returns:
         A string representation of the current timestamp in milliseconds.
     """
-    return str(int(round(time.time() * 1000)))
+    return str(time.time_ns() // 1_000_000)
+
+
+async def _async_request_pid_list(session: aiohttp.ClientSession, lang: str) -> Any:
+    """Request the product model list from the CozyLife API.
+
+    Args:
+        session: The aiohttp session to issue the request on.
+        lang: The language code for device names.
+
+    Returns:
+        The decoded JSON response, or None if the request failed.
+    """
+    url = f"http://{API_DOMAIN}/api/v2/device_product/model"
+    params = {"lang": lang}
+    timeout = aiohttp.ClientTimeout(total=10)
+
+    async with session.get(url, params=params, timeout=timeout) as res:
+        if res.status != 200:
+            _LOGGER.warning("get_pid_list failed with status %s", res.status)
+            return None
+        try:
+            # content_type=None: the API does not always label its JSON
+            return await res.json(loads=json_loads, content_type=None)
+        except ValueError as e:
+            _LOGGER.warning("get_pid_list JSON decode error: %s", e)
+            return None
 
 
 async def async_get_pid_list(
@@ -39,8 +74,10 @@ async def async_get_pid_list(
 ) -> list[dict[str, Any]]:
     """Fetch the product ID list from the CozyLife API.
 
-    Uses hass.data for caching when hass is provided, otherwise uses a simple
-    module-level cache (less preferred but maintains backward compatibility).
+    When hass is provided the list is cached in hass.data for the lifetime of
+    the process and in a Store for PID_LIST_CACHE_TTL seconds, so restarts do
+    not have to hit the API again. Concurrent callers on a cold cache share a
+    single load instead of each issuing their own request.
 
     Args:
         hass: The Home Assistant instance (optional, for caching).
@@ -49,60 +86,122 @@ async def async_get_pid_list(
     Returns:
         A list of product information dictionaries.
     """
+    if hass is None:
+        return await _async_load_pid_list(None, lang)
+
     # Check cache first
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cached = domain_data.get(CACHE_PID_LIST)
+    if cached:
+        return cached
+
+    pending: asyncio.Task[list[dict[str, Any]]] | None = domain_data.get(
+        CACHE_PID_LIST_PENDING
+    )
+    if pending is None:
+        pending = hass.async_create_background_task(
+            _async_load_pid_list(hass, lang), f"{DOMAIN} load pid list"
+        )
+        domain_data[CACHE_PID_LIST_PENDING] = pending
+        pending.add_done_callback(
+            lambda _: domain_data.pop(CACHE_PID_LIST_PENDING, None)
+        )
+
+    # Shield so a cancelled caller does not cancel the load for the others
+    return await asyncio.shield(pending)
+
+
+async def _async_load_pid_list(
+    hass: HomeAssistant | None,
+    lang: str,
+) -> list[dict[str, Any]]:
+    """Load the product ID list from the Store or the CozyLife API.
+
+    An expired stored list is still used as a fallback when the API cannot
+    be reached, since a stale model list beats having none at all.
+
+    Args:
+        hass: The Home Assistant instance, or None to skip all caching.
+        lang: The language code for device names.
+
+    Returns:
+        A list of product information dictionaries.
+    """
+    store: Store[dict[str, Any]] | None = None
+    stale: list[dict[str, Any]] | None = None
     if hass is not None:
-        hass.data.setdefault(DOMAIN, {})
-        cached = hass.data[DOMAIN].get(CACHE_PID_LIST)
-        if cached:
-            return cached
+        store = Store(hass, STORAGE_VERSION, STORAGE_KEY_PID_LIST)
+        stored = await store.async_load()
+        if stored and isinstance(stored.get("list"), list) and stored["list"]:
+            stale = stored["list"]
+            if time.time() - stored.get("ts", 0) < PID_LIST_CACHE_TTL:
+                hass.data[DOMAIN][CACHE_PID_LIST] = stale
+                return stale
+
+    result = await _async_fetch_pid_list(hass, lang)
+
+    if result is None:
+        if stale is None:
+            return []
+        _LOGGER.debug("Using expired stored pid list after failed refresh")
+        hass.data[DOMAIN][CACHE_PID_LIST] = stale
+        return stale
+
+    # Store in hass.data and on disk if available
+    if store is not None:
+        hass.data[DOMAIN][CACHE_PID_LIST] = result
+        await store.async_save({"ts": time.time(), "list": result})
 
-    if lang not in SUPPORTED_LANGUAGES:
-        _LOGGER.debug("Unsupported lang=%s, using default lang=%s", lang, LANG)
-        lang = LANG
+    return result
 
-    url = f"http://{API_DOMAIN}/api/v2/device_product/model"
-    params = {"lang": lang}
+
+async def _async_fetch_pid_list(
+    hass: HomeAssistant | None,
+    lang: str,
+) -> list[dict[str, Any]] | None:
+    """Fetch and validate the product ID list from the CozyLife API.
+
+    Args:
+        hass: The Home Assistant instance, or None to use a throwaway session.
+        lang: The language code for device names.
+
+    Returns:
+        The product list, or None if the request failed or was malformed.
+    """
+    if lang not in _LANG_MAP:
+        _LOGGER.debug("Unsupported lang=%s, using default lang=%s", lang, LANG)
+    lang = _LANG_MAP.get(lang, LANG)
 
     try:
-        timeout = aiohttp.ClientTimeout(total=10)
-        async with aiohttp.ClientSession(timeout=timeout) as session:
-            async with session.get(url, params=params) as res:
-                if res.status != 200:
-                    _LOGGER.warning("get_pid_list failed with status %s", res.status)
-                    return []
-                content = await res.text()
-                try:
-                    pid_list = json.loads(content)
-                except json.JSONDecodeError as e:
-                    _LOGGER.warning("get_pid_list JSON decode error: %s", e)
-                    return []
+        if hass is not None:
+            pid_list = await _async_request_pid_list(async_get_clientsession(hass), lang)
+        else:
+            # Legacy path without hass: use a throwaway session
+            async with aiohttp.ClientSession() as session:
+                pid_list = await _async_request_pid_list(session, lang)
     except TimeoutError:
         _LOGGER.warning("get_pid_list request timed out")
-        return []
+        return None
     except aiohttp.ClientError as e:
         _LOGGER.warning("get_pid_list HTTP error: %s", e)
-        return []
+        return None
     except Exception as e:
         _LOGGER.warning("get_pid_list unexpected error: %s", e)
-        return []
+        return None
 
     # Validate response structure
     if not isinstance(pid_list, dict):
-        return []
+        return None
 
     if pid_list.get("ret") != "1":
-        return []
+        return None
 
     info = pid_list.get("info")
     if not isinstance(info, dict):
-        return []
+        return None
 
     result = info.get("list")
     if not isinstance(result, list):
-        return []
-
-    # Store in hass.data cache if available
-    if hass is not None:
-        hass.data[DOMAIN][CACHE_PID_LIST] = result
+        return None
 
     return result
@@ -1,13 +1,23 @@
 """Fixtures for CozyLife Local integration tests."""
 import asyncio
 import json
+from dataclasses import dataclass, field
+from types import SimpleNamespace
 from unittest.mock import AsyncMock, MagicMock, Mock, patch
 import pytest
 from homeassistant.core import HomeAssistant
 from homeassistant.setup import async_setup_component
 from pytest_homeassistant_custom_component.common import MockConfigEntry
 
-from custom_components.hass_cozylife_local_pull.const import DOMAIN
+from custom_components.hass_cozylife_local_pull.const import DEVICE_STATE_ONLINE, DOMAIN
+
+
+def pytest_collection_modifyitems(config, items):
+    """Group tests by module so `--dist=loadgroup` keeps each module on one worker."""
+    if not config.pluginmanager.hasplugin("xdist"):
+        return
+    for item in items:
+        item.add_marker(pytest.mark.xdist_group(item.module.__name__))
 
 
 @pytest.fixture
@@ -21,14 +31,61 @@ def mock_setup_entry():
 
 
 @pytest.fixture
-def mock_udp_socket():
-    """Mock UDP socket for discovery tests."""
-    mock_socket = MagicMock()
-    mock_socket.settimeout = MagicMock()
-    mock_socket.setsockopt = MagicMock()
-    mock_socket.sendto = MagicMock()
-    mock_socket.close = MagicMock()
-    return mock_socket
+async def mock_datagram_endpoint():
+    """Replace the UDP discovery endpoint with a fake transport.
+
+    Datagrams listed in ``endpoint.responses`` are delivered to the protocol
+    as soon as it is created, and the broadcast and collection delays are
+    zeroed so discovery returns immediately.
+    """
+    endpoint = SimpleNamespace(
+        transport=MagicMock(), responses=[], protocol=None, kwargs=None
+    )
+
+    async def _create(protocol_factory, **kwargs):
+        endpoint.kwargs = kwargs
+        endpoint.protocol = protocol_factory()
+        for ip in endpoint.responses:
+            endpoint.protocol.datagram_received(b'{"msg":{}}', (ip, 6095))
+        return endpoint.transport, endpoint.protocol
+
+    module = "custom_components.hass_cozylife_local_pull.udp_discover"
+    loop = asyncio.get_running_loop()
+    with patch.object(loop, "create_datagram_endpoint", side_effect=_create), \
+         patch(f"{module}.BROADCAST_DELAY", 0), \
+         patch(f"{module}.RESPONSE_COLLECT_WINDOW", 0):
+        yield endpoint
+
+
+@dataclass
+class FakeTcpClient:
+    """Lightweight stand-in for TcpClient in entity tests.
+
+    Entities only duck-type the client, so plain fields plus async mocks
+    for the calls they await are enough. Defaults describe an online light.
+    """
+
+    device_id: str = "test_device_123"
+    device_name: str | None = None
+    device_model_name: str | None = None
+    device_type_code: str = "01"
+    dpid: list[str] = field(default_factory=list)
+    available: bool = True
+    device_state: str = DEVICE_STATE_ONLINE
+    last_state: dict | None = None  # No initial state
+    is_connected: MagicMock = field(default_factory=lambda: MagicMock(return_value=True))
+    connect: AsyncMock = field(default_factory=lambda: AsyncMock(return_value=True))
+    query: AsyncMock = field(default_factory=lambda: AsyncMock(return_value={}))
+    control: AsyncMock = field(default_factory=lambda: AsyncMock(return_value=True))
+
+
+@pytest.fixture
+def make_tcp_client():
+    """Return a builder for online fake TCP clients.
+
+    Keyword arguments override the default attributes of the built client.
+    """
+    return FakeTcpClient
 
 
 @pytest.fixture
@@ -41,6 +98,8 @@ def mock_tcp_connection():
     mock_writer.wait_closed = AsyncMock()
     mock_writer.drain = AsyncMock()
     mock_writer.write = MagicMock()
+    # StreamWriter.get_extra_info is synchronous; no real socket to tune
+    mock_writer.get_extra_info = MagicMock(return_value=None)
     return mock_reader, mock_writer
 
 
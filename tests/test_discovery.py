@@ -5,11 +5,12 @@ from unittest.mock import AsyncMock, MagicMock, patch
 import pytest
 from homeassistant.core import HomeAssistant
 
-from custom_components.hass_cozylife_local_pull.discovery import async_discover_devices
+from custom_components.hass_cozylife_local_pull.discovery import async_discover_devices, async_probe_ips
+
+
+pytestmark = pytest.mark.integration
 
 
-@pytest.mark.integration
-@pytest.mark.asyncio
 class TestHostnameDiscovery:
     """Test hostname discovery functionality."""
 
@@ -155,3 +156,19 @@ class TestHostnameDiscovery:
         assert call_count == 253
         assert "192.168.1.100" in result
 
+
+    async def test_probe_ips_returns_reachable(self):
+        """Test that only IPs accepting a TCP connection are returned."""
+        writer = MagicMock()
+        writer.wait_closed = AsyncMock()
+
+        async def mock_open_connection(ip, port):
+            if ip == "192.168.1.100":
+                return MagicMock(), writer
+            raise OSError("Connection refused")
+
+        with patch('asyncio.open_connection', side_effect=mock_open_connection):
+            result = await async_probe_ips(["192.168.1.100", "192.168.1.101"])
+
+        assert result == ["192.168.1.100"]
+        writer.close.assert_called_once()
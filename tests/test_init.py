@@ -1,10 +1,18 @@
 """Tests for integration setup."""
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
 
+from custom_components import hass_cozylife_local_pull as integration
 from custom_components.hass_cozylife_local_pull import async_setup, async_setup_entry, async_unload_entry
-from custom_components.hass_cozylife_local_pull.const import DOMAIN
+from custom_components.hass_cozylife_local_pull.const import DOMAIN, STORAGE_KEY_KNOWN_IPS
+
+pytestmark = pytest.mark.integration
 
 
 def create_mock_client(ip: str = "192.168.1.100", device_type: str = "01"):
@@ -33,8 +41,77 @@ def create_mock_coordinator():
     return mock_coordinator
 
 
-@pytest.mark.integration
-@pytest.mark.asyncio
+@pytest.fixture(autouse=True)
+def _noop_unload_platforms(monkeypatch):
+    """Report platform unloads as successful without touching real platforms."""
+    monkeypatch.setattr(
+        "homeassistant.config_entries.ConfigEntries.async_unload_platforms",
+        AsyncMock(return_value=True),
+    )
+
+
+@pytest.fixture
+def manual_config_entry():
+    """Config entry with two manually configured IPs."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={"ips": "192.168.1.200,192.168.1.201"},
+        entry_id="test_entry_manual",
+        title="CozyLife Local",
+    )
+
+
+@pytest.fixture
+def merge_config_entry():
+    """Config entry with one manually configured IP to merge with discovery."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={"ips": "192.168.1.200"},
+        entry_id="test_merge",
+        title="CozyLife Local",
+    )
+
+
+@pytest.fixture
+def parallel_config_entry():
+    """Config entry with ten manually configured IPs."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={"ips": ",".join(f"192.168.1.{i}" for i in range(10, 20))},
+        entry_id="test_parallel",
+        title="CozyLife Local",
+    )
+
+
+@pytest.fixture
+def patched_setup(hass: HomeAssistant):
+    """Patch discovery, device creation and platform forwarding for setup tests.
+
+    Discovery finds nothing by default; tests set return values on the
+    exposed mocks for the paths they exercise.
+    """
+    mocks = SimpleNamespace(
+        get_ip=AsyncMock(return_value=[]),
+        discover=AsyncMock(return_value=[]),
+        client=create_mock_client("192.168.1.100"),
+        coordinator=create_mock_coordinator(),
+    )
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(patch.object(integration, 'async_get_ip', mocks.get_ip))
+        stack.enter_context(patch.object(integration, 'async_discover_devices', mocks.discover))
+        mocks.tcp_client = stack.enter_context(
+            patch.object(integration, 'TcpClient', return_value=mocks.client)
+        )
+        stack.enter_context(
+            patch.object(integration, 'DeviceCoordinator', return_value=mocks.coordinator)
+        )
+        stack.enter_context(patch.object(
+            hass.config_entries, 'async_forward_entry_setups', new_callable=AsyncMock
+        ))
+        yield mocks
+
+
 class TestIntegrationSetup:
     """Test integration setup and configuration."""
 
@@ -46,144 +123,57 @@ class TestIntegrationSetup:
         assert DOMAIN in hass.data
 
     async def test_async_setup_entry_with_udp_discovery(
-        self, hass: HomeAssistant, mock_config_entry,
+        self, hass: HomeAssistant, mock_config_entry, patched_setup,
         mock_async_get_pid_list, mock_get_sn
     ):
         """Test setup entry with UDP discovery."""
-        mock_client = create_mock_client("192.168.1.100")
-        mock_coordinator = create_mock_coordinator()
-
-        with patch(
-            'custom_components.hass_cozylife_local_pull.get_ip',
-            return_value=['192.168.1.100']
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.async_discover_devices',
-            return_value=[]
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.TcpClient',
-            return_value=mock_client
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.DeviceCoordinator',
-            return_value=mock_coordinator
-        ), patch.object(
-            hass.config_entries, 'async_forward_entry_setups', new_callable=AsyncMock
-        ), patch.object(
-            hass.config_entries, 'async_unload_platforms', new_callable=AsyncMock, return_value=True
-        ):
-            result = await async_setup_entry(hass, mock_config_entry)
+        patched_setup.get_ip.return_value = ['192.168.1.100']
 
-            assert result is True
-            assert DOMAIN in hass.data
-            assert mock_config_entry.entry_id in hass.data[DOMAIN]
-            mock_coordinator.start.assert_called_once()
+        result = await async_setup_entry(hass, mock_config_entry)
 
-            # Clean up
-            await async_unload_entry(hass, mock_config_entry)
-            mock_coordinator.stop.assert_called_once()
+        assert result is True
+        assert DOMAIN in hass.data
+        assert mock_config_entry.entry_id in hass.data[DOMAIN]
+        patched_setup.coordinator.start.assert_called_once()
 
     async def test_async_setup_entry_with_hostname_discovery(
-        self, hass: HomeAssistant, mock_config_entry,
+        self, hass: HomeAssistant, mock_config_entry, patched_setup,
         mock_async_get_pid_list, mock_get_sn
     ):
         """Test setup entry with hostname discovery."""
-        mock_client = create_mock_client("192.168.1.101")
-        mock_coordinator = create_mock_coordinator()
-
-        with patch(
-            'custom_components.hass_cozylife_local_pull.get_ip',
-            return_value=[]
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.async_discover_devices',
-            return_value=['192.168.1.101']
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.TcpClient',
-            return_value=mock_client
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.DeviceCoordinator',
-            return_value=mock_coordinator
-        ), patch.object(
-            hass.config_entries, 'async_forward_entry_setups', new_callable=AsyncMock
-        ), patch.object(
-            hass.config_entries, 'async_unload_platforms', new_callable=AsyncMock, return_value=True
-        ):
-            result = await async_setup_entry(hass, mock_config_entry)
+        patched_setup.client = create_mock_client("192.168.1.101")
+        patched_setup.tcp_client.return_value = patched_setup.client
+        patched_setup.discover.return_value = ['192.168.1.101']
 
-            assert result is True
-            assert DOMAIN in hass.data
-            assert mock_config_entry.entry_id in hass.data[DOMAIN]
+        result = await async_setup_entry(hass, mock_config_entry)
 
-            # Clean up
-            await async_unload_entry(hass, mock_config_entry)
+        assert result is True
+        assert DOMAIN in hass.data
+        assert mock_config_entry.entry_id in hass.data[DOMAIN]
 
     async def test_async_setup_entry_with_manual_ip(
-        self, hass: HomeAssistant, mock_async_get_pid_list, mock_get_sn
+        self, hass: HomeAssistant, manual_config_entry, patched_setup,
+        mock_async_get_pid_list, mock_get_sn
     ):
         """Test setup entry with manually configured IP."""
-        from pytest_homeassistant_custom_component.common import MockConfigEntry
+        config_entry = manual_config_entry
+        patched_setup.client = create_mock_client("192.168.1.200")
+        patched_setup.tcp_client.return_value = patched_setup.client
 
-        config_entry = MockConfigEntry(
-            domain=DOMAIN,
-            data={"ips": "192.168.1.200,192.168.1.201"},
-            entry_id="test_entry_manual",
-            title="CozyLife Local",
-        )
-
-        mock_client = create_mock_client("192.168.1.200")
-        mock_coordinator = create_mock_coordinator()
+        result = await async_setup_entry(hass, config_entry)
 
-        with patch(
-            'custom_components.hass_cozylife_local_pull.get_ip',
-            return_value=[]
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.async_discover_devices',
-            return_value=[]
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.TcpClient',
-            return_value=mock_client
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.DeviceCoordinator',
-            return_value=mock_coordinator
-        ), patch.object(
-            hass.config_entries, 'async_forward_entry_setups', new_callable=AsyncMock
-        ), patch.object(
-            hass.config_entries, 'async_unload_platforms', new_callable=AsyncMock, return_value=True
-        ):
-            result = await async_setup_entry(hass, config_entry)
-
-            assert result is True
-            assert config_entry.entry_id in hass.data[DOMAIN]
-
-            # Clean up
-            await async_unload_entry(hass, config_entry)
+        assert result is True
+        assert config_entry.entry_id in hass.data[DOMAIN]
 
     async def test_async_setup_entry_no_devices(
-        self, hass: HomeAssistant, mock_config_entry,
+        self, hass: HomeAssistant, mock_config_entry, patched_setup,
         mock_async_get_pid_list, mock_get_sn
     ):
         """Test setup entry when no devices are found."""
-        mock_coordinator = create_mock_coordinator()
+        # Should still return True even with no devices
+        result = await async_setup_entry(hass, mock_config_entry)
 
-        with patch(
-            'custom_components.hass_cozylife_local_pull.get_ip',
-            return_value=[]
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.async_discover_devices',
-            return_value=[]
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.DeviceCoordinator',
-            return_value=mock_coordinator
-        ), patch.object(
-            hass.config_entries, 'async_forward_entry_setups', new_callable=AsyncMock
-        ), patch.object(
-            hass.config_entries, 'async_unload_platforms', new_callable=AsyncMock, return_value=True
-        ):
-            # Should still return True even with no devices
-            result = await async_setup_entry(hass, mock_config_entry)
-
-            assert result is True
-
-            # Clean up
-            await async_unload_entry(hass, mock_config_entry)
+        assert result is True
 
     async def test_async_unload_entry(
         self, hass: HomeAssistant, mock_config_entry
@@ -193,55 +183,86 @@ class TestIntegrationSetup:
         mock_coordinator = create_mock_coordinator()
         hass.data[DOMAIN] = {mock_config_entry.entry_id: {'coordinator': mock_coordinator, 'tcp_client': []}}
 
-        with patch(
-            'homeassistant.config_entries.ConfigEntries.async_unload_platforms',
-            return_value=True
-        ):
-            result = await async_unload_entry(hass, mock_config_entry)
+        result = await async_unload_entry(hass, mock_config_entry)
 
         assert result is True
         assert mock_config_entry.entry_id not in hass.data[DOMAIN]
         mock_coordinator.stop.assert_called_once()
 
     async def test_async_setup_entry_merges_discovery_methods(
-        self, hass: HomeAssistant, mock_config_entry,
+        self, hass: HomeAssistant, merge_config_entry, patched_setup,
         mock_async_get_pid_list, mock_get_sn
     ):
-        """Test that all discovery methods are merged."""
-        from pytest_homeassistant_custom_component.common import MockConfigEntry
-
-        config_entry = MockConfigEntry(
-            domain=DOMAIN,
-            data={"ips": "192.168.1.200"},
-            entry_id="test_merge",
-            title="CozyLife Local",
-        )
+        """Test that UDP and configured IPs are merged, skipping the hostname sweep."""
+        config_entry = merge_config_entry
+        patched_setup.get_ip.return_value = ['192.168.1.100']
+        patched_setup.discover.return_value = ['192.168.1.101']
 
-        mock_client = create_mock_client("192.168.1.100")
-        mock_coordinator = create_mock_coordinator()
+        result = await async_setup_entry(hass, config_entry)
 
-        with patch(
-            'custom_components.hass_cozylife_local_pull.get_ip',
-            return_value=['192.168.1.100']
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.async_discover_devices',
-            return_value=['192.168.1.101']
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.TcpClient',
-            return_value=mock_client
-        ), patch(
-            'custom_components.hass_cozylife_local_pull.DeviceCoordinator',
-            return_value=mock_coordinator
-        ), patch.object(
-            hass.config_entries, 'async_forward_entry_setups', new_callable=AsyncMock
-        ), patch.object(
-            hass.config_entries, 'async_unload_platforms', new_callable=AsyncMock, return_value=True
-        ):
-            result = await async_setup_entry(hass, config_entry)
+        assert result is True
+        # UDP found a device, so the hostname sweep is skipped and only
+        # UDP (192.168.1.100) and manual (192.168.1.200) IPs are used
+        patched_setup.discover.assert_not_called()
+        ips = {call[0][0] for call in patched_setup.tcp_client.call_args_list}
+        assert ips == {'192.168.1.100', '192.168.1.200'}
+
+    async def test_async_setup_entry_skips_discovery_for_known_ips(
+        self, hass: HomeAssistant, hass_storage, mock_config_entry, patched_setup,
+        mock_async_get_pid_list, mock_get_sn
+    ):
+        """Test that discovery is skipped when every stored IP responds."""
+        hass_storage[STORAGE_KEY_KNOWN_IPS] = {
+            "version": 1,
+            "key": STORAGE_KEY_KNOWN_IPS,
+            "data": {"ips": ["192.168.1.100"]},
+        }
+
+        with patch.object(integration, 'async_probe_ips', return_value=['192.168.1.100']):
+            result = await async_setup_entry(hass, mock_config_entry)
 
-            assert result is True
-            # Should have attempted to connect to all 3 unique IPs
-            # (UDP: 192.168.1.100, Hostname: 192.168.1.101, Manual: 192.168.1.200)
+        assert result is True
+        patched_setup.get_ip.assert_not_called()
+        assert patched_setup.tcp_client.call_args[0][0] == '192.168.1.100'
 
-            # Clean up
-            await async_unload_entry(hass, config_entry)
+    async def test_async_setup_entry_connects_devices_in_parallel(
+        self, hass: HomeAssistant, parallel_config_entry, patched_setup,
+        mock_async_get_pid_list, mock_get_sn
+    ):
+        """Test that setup connects to all devices concurrently."""
+        ips = parallel_config_entry.data["ips"].split(",")
+        in_flight = 0
+        peak = 0
+
+        async def slow_connect(*args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.1)
+            in_flight -= 1
+            return True
+
+        clients = [create_mock_client(ip) for ip in ips]
+        for client in clients:
+            client.connect = AsyncMock(side_effect=slow_connect)
+        patched_setup.tcp_client.side_effect = clients
+
+        result = await async_setup_entry(hass, parallel_config_entry)
+
+        assert result is True
+        assert peak == len(clients)
+
+    async def test_reconnect_all_service(self, hass: HomeAssistant):
+        """Test reconnect_all disconnects and reconnects every coordinator client."""
+        await async_setup(hass, {})
+        clients = [create_mock_client(f"192.168.1.{i}") for i in (100, 101)]
+        coordinator = create_mock_coordinator()
+        coordinator.clients = clients
+        hass.data[DOMAIN]["test_entry_id"] = {"coordinator": coordinator}
+
+        with patch.object(integration, "RECONNECT_ALL_DELAY", 0):
+            await hass.services.async_call(DOMAIN, "reconnect_all", {}, blocking=True)
+
+        for client in clients:
+            client.disconnect.assert_awaited_once()
+            client.connect.assert_awaited_once_with(force=True)
@@ -1,5 +1,6 @@
 """Tests for light entity."""
-import asyncio
+from types import MappingProxyType
+
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from homeassistant.components.light import (
@@ -9,45 +10,44 @@ from homeassistant.components.light import (
     ColorMode,
 )
 
+from custom_components.hass_cozylife_local_pull import light as light_module
 from custom_components.hass_cozylife_local_pull.light import CozyLifeLight
-from custom_components.hass_cozylife_local_pull.tcp_client import tcp_client
+
+pytestmark = pytest.mark.unit
+
+# Read-only so no test can leak changes to the shared query result
+_LIGHT_QUERY_STATE = MappingProxyType({
+    '1': 255,
+    '2': 0,
+    '3': 500,
+    '4': 512,
+    '5': 180,
+    '6': 500
+})
 
 
-@pytest.mark.unit
-@pytest.mark.asyncio
 class TestCozyLifeLight:
     """Test CozyLife light entity."""
 
     @pytest.fixture
-    def mock_tcp_client(self):
+    def mock_tcp_client(self, make_tcp_client):
         """Create a mock TCP client."""
-        from custom_components.hass_cozylife_local_pull.const import DEVICE_STATE_ONLINE
-        client = MagicMock(spec=tcp_client)
-        client.device_id = "test_light_123"
-        client.device_name = "Living Room Light"  # User-given name from CozyLife app
-        client.device_model_name = "Test Light"
-        client.device_type_code = "01"
-        client.dpid = ['1', '2', '3', '4', '5', '6']
-        client.available = True
-        client.device_state = DEVICE_STATE_ONLINE  # New property for availability
-        client.last_state = None  # No initial state
-        client.connect = AsyncMock(return_value=True)
-        client.query = AsyncMock(return_value={
-            '1': 255,
-            '2': 0,
-            '3': 500,
-            '4': 512,
-            '5': 180,
-            '6': 500
-        })
-        client.control = AsyncMock(return_value=True)
-        return client
+        return make_tcp_client(
+            device_id="test_light_123",
+            device_name="Living Room Light",  # User-given name from CozyLife app
+            device_model_name="Test Light",
+            device_type_code="01",
+            dpid=['1', '2', '3', '4', '5', '6'],
+            query=AsyncMock(return_value=_LIGHT_QUERY_STATE),
+        )
 
     @pytest.fixture
     def mock_hass(self):
         """Create a mock Home Assistant instance."""
         hass = MagicMock()
-        hass.async_create_task = MagicMock(side_effect=lambda coro: asyncio.create_task(coro))
+        # Entities await their updates inline; close anything scheduled here
+        # so a stray task neither runs nor leaks as never-awaited
+        hass.async_create_task = MagicMock(side_effect=lambda coro: coro.close())
         return hass
 
     async def test_light_init(self, mock_tcp_client):
@@ -70,34 +70,40 @@ class TestCozyLifeLight:
 
         mock_tcp_client.connect.assert_called_once()
 
-    async def test_light_update_features_rgbcw(self, mock_tcp_client):
-        """Test feature detection for RGBCW light."""
-        mock_tcp_client.dpid = ['1', '2', '3', '4', '5', '6']
+    @pytest.mark.parametrize(
+        ("dpid", "expected_mode"),
+        [
+            (['1', '2', '3', '4', '5', '6'], ColorMode.HS),  # RGBCW light
+            (['1', '2', '3', '4'], ColorMode.COLOR_TEMP),  # CW light
+            (['1', '2', '4'], ColorMode.BRIGHTNESS),  # Brightness-only light
+        ],
+        ids=["rgbcw", "cw", "brightness_only"],
+    )
+    async def test_light_update_features(self, mock_tcp_client, dpid, expected_mode):
+        """Test feature detection from the device's data point IDs."""
+        mock_tcp_client.dpid = dpid
         light = CozyLifeLight(mock_tcp_client)
 
         light._update_features()
 
-        assert ColorMode.HS in light._attr_supported_color_modes
-        assert light._attr_color_mode == ColorMode.HS
+        assert expected_mode in light._attr_supported_color_modes
+        assert light._attr_color_mode == expected_mode
 
-    async def test_light_update_features_cw(self, mock_tcp_client):
-        """Test feature detection for CW light."""
-        mock_tcp_client.dpid = ['1', '2', '3', '4']
+    async def test_light_update_features_caches_dpid_mask(self, mock_tcp_client):
+        """Test the dpid mask is only rebuilt when the client's dpid list changes."""
         light = CozyLifeLight(mock_tcp_client)
 
-        light._update_features()
+        with patch.object(
+            light_module, "_dpid_mask", wraps=light_module._dpid_mask
+        ) as build_mask:
+            light._update_features()
+            light._update_features()
+            assert build_mask.call_count == 1
 
-        assert ColorMode.COLOR_TEMP in light._attr_supported_color_modes
-        assert light._attr_color_mode == ColorMode.COLOR_TEMP
-
-    async def test_light_update_features_brightness_only(self, mock_tcp_client):
-        """Test feature detection for brightness-only light."""
-        mock_tcp_client.dpid = ['1', '2', '4']
-        light = CozyLifeLight(mock_tcp_client)
-
-        light._update_features()
+            mock_tcp_client.dpid = ['1', '2', '4']
+            light._update_features()
 
-        assert ColorMode.BRIGHTNESS in light._attr_supported_color_modes
+        assert build_mask.call_count == 2
         assert light._attr_color_mode == ColorMode.BRIGHTNESS
 
     async def test_light_async_update(self, mock_tcp_client):
@@ -107,70 +113,70 @@ class TestCozyLifeLight:
         await light.async_update()
 
         assert light._attr_is_on is True
-        # Device 512/1000 -> HA: round(512 * 255 / 1000) = 131
+        # Device 512/1000 -> HA: (512 * 255 + 500) // 1000 = 131
         assert light._attr_brightness == 131
         assert light._attr_hs_color == (180, 50)  # (180, 500/10)
 
-    async def test_light_turn_on_basic(self, mock_tcp_client, mock_hass):
-        """Test turning light on."""
+    @pytest.mark.parametrize(
+        ("device_brightness", "expected"),
+        [(0, 0), (2, 1), (300, 77), (512, 131), (1000, 255)],
+    )
+    async def test_light_async_update_brightness_scaling(
+        self, mock_tcp_client, device_brightness, expected
+    ):
+        """Test device brightness maps onto 0-255 rounding half up."""
+        mock_tcp_client.query = AsyncMock(return_value={'1': 255, '4': device_brightness})
         light = CozyLifeLight(mock_tcp_client)
-        light.hass = mock_hass
-        light.async_write_ha_state = MagicMock()
 
-        await light.async_turn_on()
-
-        mock_tcp_client.control.assert_called_once()
-        call_args = mock_tcp_client.control.call_args[0][0]
-        assert call_args['1'] == 255
-        assert light._attr_is_on is True
-        light.async_write_ha_state.assert_called_once()
+        await light.async_update()
 
-    async def test_light_turn_on_with_brightness(self, mock_tcp_client, mock_hass):
-        """Test turning light on with brightness."""
-        # Mock query to return state with brightness after command
-        mock_tcp_client.query = AsyncMock(return_value={'1': 255, '4': 784})
+        assert light._attr_brightness == expected
+
+    @pytest.mark.parametrize(
+        ("kwargs", "query_state", "expected_payload", "attr", "attr_val"),
+        [
+            ({}, _LIGHT_QUERY_STATE, {'1': 255}, "_attr_is_on", True),
+            # HA 200/255 -> Device: min(200 * 1000 // 255, 1000) = 784
+            # Device 784/1000 -> HA: (784 * 255 + 500) // 1000 = 200
+            (
+                {ATTR_BRIGHTNESS: 200}, {'1': 255, '4': 784}, {'1': 255, '4': 784},
+                "_attr_brightness", 200,
+            ),
+            # 4000K -> Device: (4000 - 2000) * 1000 // 4500 = 444
+            # Device 500 -> HA: 2000 + 500 * 4500 // 1000 = 4250K
+            (
+                {ATTR_COLOR_TEMP_KELVIN: 4000}, {'1': 255, '3': 500}, {'1': 255, '3': 444},
+                "_attr_color_temp_kelvin", 4250,
+            ),
+            # Saturation 75 -> Device: 75 * 10 = 750
+            (
+                {ATTR_HS_COLOR: (120, 75)}, {'1': 255, '5': 120, '6': 750},
+                {'1': 255, '5': 120, '6': 750}, "_attr_hs_color", (120.0, 75.0),
+            ),
+        ],
+        ids=["basic", "brightness", "color_temp", "hs_color"],
+    )
+    async def test_light_turn_on(
+        self, mock_tcp_client, mock_hass, kwargs, query_state, expected_payload,
+        attr, attr_val
+    ):
+        """Test turning light on, optionally with brightness or color."""
+        # Mock query to return the state reported after the command
+        mock_tcp_client.query = AsyncMock(return_value=query_state)
         light = CozyLifeLight(mock_tcp_client)
         light.hass = mock_hass
         light.async_write_ha_state = MagicMock()
 
-        await light.async_turn_on(**{ATTR_BRIGHTNESS: 200})
+        await light.async_turn_on(**kwargs)
 
+        mock_tcp_client.control.assert_called_once()
         call_args = mock_tcp_client.control.call_args[0][0]
-        # HA 200/255 -> Device: min(int(200 * 1000 / 255), 1000) = 784
-        assert call_args['4'] == 784
+        for dpid, value in expected_payload.items():
+            assert call_args[dpid] == value
         # State is updated via async_update which queries the device
         assert light._attr_is_on is True
-
-    async def test_light_turn_on_with_color_temp(self, mock_tcp_client, mock_hass):
-        """Test turning light on with color temperature."""
-        # Mock query to return state with color temp after command
-        mock_tcp_client.query = AsyncMock(return_value={'1': 255, '3': 500})
-        light = CozyLifeLight(mock_tcp_client)
-        light.hass = mock_hass
-        light.async_write_ha_state = MagicMock()
-
-        await light.async_turn_on(**{ATTR_COLOR_TEMP_KELVIN: 4000})
-
-        call_args = mock_tcp_client.control.call_args[0][0]
-        assert '3' in call_args
-        # State is updated via async_update
-        assert light._attr_is_on is True
-
-    async def test_light_turn_on_with_hs_color(self, mock_tcp_client, mock_hass):
-        """Test turning light on with HS color."""
-        # Mock query to return state with HS color after command
-        mock_tcp_client.query = AsyncMock(return_value={'1': 255, '5': 120, '6': 750})
-        light = CozyLifeLight(mock_tcp_client)
-        light.hass = mock_hass
-        light.async_write_ha_state = MagicMock()
-
-        await light.async_turn_on(**{ATTR_HS_COLOR: (120, 75)})
-
-        call_args = mock_tcp_client.control.call_args[0][0]
-        assert call_args['5'] == 120
-        assert call_args['6'] == 750  # 75 * 10
-        # State is updated via async_update
-        assert light._attr_is_on is True
+        assert getattr(light, attr) == attr_val
+        light.async_write_ha_state.assert_called_once()
 
     async def test_light_turn_off(self, mock_tcp_client, mock_hass):
         """Test turning light off."""
@@ -197,7 +203,8 @@ class TestCozyLifeLight:
         await light.async_turn_on()
 
         # State should not be updated on failure
-        mock_hass.async_create_task.assert_not_called()
+        mock_tcp_client.control.assert_awaited_once()
+        mock_tcp_client.query.assert_not_awaited()
 
     async def test_light_available(self, mock_tcp_client):
         """Test light availability."""
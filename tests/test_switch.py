@@ -1,40 +1,35 @@
 """Tests for switch entity."""
-import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock
 
 from custom_components.hass_cozylife_local_pull.switch import CozyLifeSwitch
-from custom_components.hass_cozylife_local_pull.tcp_client import tcp_client
 
 
-@pytest.mark.unit
-@pytest.mark.asyncio
+pytestmark = pytest.mark.unit
+
+
 class TestCozyLifeSwitch:
     """Test CozyLife switch entity."""
 
     @pytest.fixture
-    def mock_tcp_client(self):
+    def mock_tcp_client(self, make_tcp_client):
         """Create a mock TCP client."""
-        from custom_components.hass_cozylife_local_pull.const import DEVICE_STATE_ONLINE
-        client = MagicMock(spec=tcp_client)
-        client.device_id = "test_switch_456"
-        client.device_name = "Kitchen Switch"  # User-given name from CozyLife app
-        client.device_model_name = "Test Switch"
-        client.device_type_code = "00"
-        client.dpid = ['1']
-        client.available = True
-        client.device_state = DEVICE_STATE_ONLINE  # New property for availability
-        client.last_state = None  # No initial state
-        client.connect = AsyncMock(return_value=True)
-        client.query = AsyncMock(return_value={'1': 255})
-        client.control = AsyncMock(return_value=True)
-        return client
+        return make_tcp_client(
+            device_id="test_switch_456",
+            device_name="Kitchen Switch",  # User-given name from CozyLife app
+            device_model_name="Test Switch",
+            device_type_code="00",
+            dpid=['1'],
+            query=AsyncMock(return_value={'1': 255}),
+        )
 
     @pytest.fixture
     def mock_hass(self):
         """Create a mock Home Assistant instance."""
         hass = MagicMock()
-        hass.async_create_task = MagicMock(side_effect=lambda coro: asyncio.create_task(coro))
+        # Entities await their updates inline; close anything scheduled here
+        # so a stray task neither runs nor leaks as never-awaited
+        hass.async_create_task = MagicMock(side_effect=lambda coro: coro.close())
         return hass
 
     async def test_switch_init(self, mock_tcp_client):
@@ -141,7 +136,8 @@ class TestCozyLifeSwitch:
 
         # State should not be updated on failure
         assert switch._attr_is_on is False
-        mock_hass.async_create_task.assert_not_called()
+        mock_tcp_client.control.assert_awaited_once()
+        mock_tcp_client.query.assert_not_awaited()
 
     async def test_switch_turn_off_failure(self, mock_tcp_client, mock_hass):
         """Test handling of turn off failure."""
@@ -154,7 +150,8 @@ class TestCozyLifeSwitch:
 
         # State should not be updated on failure
         assert switch._attr_is_on is True
-        mock_hass.async_create_task.assert_not_called()
+        mock_tcp_client.control.assert_awaited_once()
+        mock_tcp_client.query.assert_not_awaited()
 
     async def test_switch_available(self, mock_tcp_client):
         """Test switch availability."""
@@ -7,8 +7,9 @@ import pytest
 from custom_components.hass_cozylife_local_pull.tcp_client import tcp_client, CMD_INFO, CMD_QUERY, CMD_SET
 
 
-@pytest.mark.unit
-@pytest.mark.asyncio
+pytestmark = pytest.mark.unit
+
+
 class TestTCPClient:
     """Test TCP client functionality."""
 
@@ -27,6 +28,49 @@ class TestTCPClient:
         assert client.device_id == "test_device_123"
         assert client._info.pid == "test_pid_001"
 
+    async def test_reconnect_skips_info_when_cached(self, mock_tcp_connection,
+                                                    mock_device_info_response,
+                                                    mock_query_response,
+                                                    mock_async_get_pid_list, mock_get_sn):
+        """Test a reconnect reuses cached device info instead of resending CMD_INFO."""
+        mock_reader, mock_writer = mock_tcp_connection
+        mock_reader.read = AsyncMock(side_effect=[mock_device_info_response, mock_query_response])
+
+        with patch('asyncio.open_connection', return_value=(mock_reader, mock_writer)):
+            client = tcp_client("192.168.1.100")
+            assert await client.connect() is True
+            await client._close_connection()
+            mock_writer.write.reset_mock()
+
+            result = await client.query()
+
+        assert result.get('1') == 255
+        assert client.device_id == "test_device_123"
+        # Only the query went out on the second connection
+        mock_writer.write.assert_called_once()
+        assert json.loads(mock_writer.write.call_args[0][0])['cmd'] == CMD_QUERY
+
+    async def test_reconnect_retries_info_when_model_lookup_failed(
+        self, mock_tcp_connection, mock_device_info_response, mock_query_response, mock_get_sn
+    ):
+        """Test device info is fetched again when the pid list was unavailable."""
+        mock_reader, mock_writer = mock_tcp_connection
+        mock_reader.read = AsyncMock(side_effect=[
+            mock_device_info_response, mock_query_response,
+            mock_device_info_response, mock_query_response,
+        ])
+
+        with patch('asyncio.open_connection', return_value=(mock_reader, mock_writer)), \
+             patch('custom_components.hass_cozylife_local_pull.tcp_client.async_get_pid_list',
+                   return_value=[]) as mock_pid_list:
+            client = tcp_client("192.168.1.100")
+            assert await client.connect() is True
+            await client._close_connection()
+            assert await client.connect() is True
+
+        assert mock_pid_list.call_count == 2
+        assert client._info_cached is False
+
     async def test_connect_timeout(self):
         """Test connection timeout."""
         with patch('asyncio.open_connection', side_effect=asyncio.TimeoutError()):
@@ -53,12 +97,51 @@ class TestTCPClient:
         client = tcp_client("192.168.1.100")
         assert client.is_connected() is False
 
+        with patch('asyncio.open_connection', return_value=(mock_reader, mock_writer)), \
+             patch.object(client, '_device_info', new_callable=AsyncMock):
+            client._info.dpid = ['1']
+            await client.connect()
+        assert client.is_connected() is True
+
+        await client._close_connection()
+        assert client.is_connected() is False
+
+    async def test_is_connected_false_when_transport_closing(self, mock_tcp_connection):
+        """Test a transport torn down by the event loop is not reported as connected."""
+        _, mock_writer = mock_tcp_connection
+        client = tcp_client("192.168.1.100")
         client._writer = mock_writer
         assert client.is_connected() is True
 
+        # e.g. connection reset: the loop closes the transport, we never
+        # went through _close_connection()
         mock_writer.is_closing = MagicMock(return_value=True)
+
         assert client.is_connected() is False
 
+    async def test_query_reconnects_when_transport_closing(self, mock_tcp_connection,
+                                                           mock_device_info_response,
+                                                           mock_query_response,
+                                                           mock_async_get_pid_list, mock_get_sn):
+        """Test query reconnects instead of writing into a closing transport."""
+        mock_reader, mock_writer = mock_tcp_connection
+        mock_reader.read = AsyncMock(side_effect=[mock_device_info_response, mock_query_response])
+
+        dead_writer = MagicMock()
+        dead_writer.is_closing = MagicMock(return_value=True)
+        dead_writer.wait_closed = AsyncMock()
+
+        client = tcp_client("192.168.1.100")
+        client._reader = AsyncMock()
+        client._writer = dead_writer
+
+        with patch('asyncio.open_connection', return_value=(mock_reader, mock_writer)) as mock_open:
+            result = await client.query()
+
+        mock_open.assert_called_once()
+        dead_writer.write.assert_not_called()
+        assert result.get('1') == 255
+
     async def test_query_success(self, mock_tcp_connection, mock_query_response,
                                 mock_async_get_pid_list, mock_get_sn):
         """Test successful query."""
@@ -76,6 +159,25 @@ class TestTCPClient:
         assert result.get('1') == 255  # on
         assert result.get('4') == 512  # brightness
 
+    async def test_concurrent_queries_share_one_request(self, mock_tcp_connection,
+                                                        mock_query_response, mock_get_sn):
+        """Test overlapping query calls are served by a single CMD_QUERY."""
+        mock_reader, mock_writer = mock_tcp_connection
+        mock_reader.read = AsyncMock(return_value=mock_query_response)
+
+        client = tcp_client("192.168.1.100")
+        client._reader = mock_reader
+        client._writer = mock_writer
+        client._available = True
+
+        first, second = await asyncio.gather(client.query(), client.query())
+
+        mock_writer.write.assert_called_once()
+        assert first == second
+        assert first.get('1') == 255
+        assert first is not second
+        assert client._pending_query is None
+
     async def test_query_reconnect_on_disconnect(self, mock_tcp_connection, 
                                                  mock_device_info_response,
                                                  mock_query_response,
@@ -157,6 +259,59 @@ class TestTCPClient:
         assert result is True
         assert client.available is True
 
+    async def test_query_then_control_reuses_connection(self, mock_tcp_connection,
+                                                        mock_device_info_response,
+                                                        mock_query_response,
+                                                        mock_get_sn,
+                                                        mock_async_get_pid_list):
+        """Test sequential commands share one connection instead of reconnecting."""
+        mock_reader, mock_writer = mock_tcp_connection
+        ack = json.dumps({"cmd": 3, "sn": "1234567890", "msg": {}}).encode('utf-8')
+        mock_reader.read = AsyncMock(
+            side_effect=[mock_device_info_response, mock_query_response, ack]
+        )
+
+        with patch('asyncio.open_connection', return_value=(mock_reader, mock_writer)) as mock_open:
+            client = tcp_client("192.168.1.100")
+            assert (await client.query()).get('1') == 255
+            assert await client.control({'1': 0}) is True
+
+        mock_open.assert_called_once()
+        mock_writer.close.assert_not_called()
+
+    async def test_control_batches_concurrent_payloads(self, mock_tcp_connection, mock_get_sn):
+        """Test concurrent control calls are merged into one CMD_SET."""
+        mock_reader, mock_writer = mock_tcp_connection
+        mock_reader.read = AsyncMock(side_effect=asyncio.TimeoutError())
+
+        client = tcp_client("192.168.1.100")
+        client._reader = mock_reader
+        client._writer = mock_writer
+        client._available = True
+
+        results = await asyncio.gather(
+            client.control({'1': 255}),
+            client.control({'4': 512}),
+        )
+
+        assert results == [True, True]
+        mock_writer.write.assert_called_once()
+        package = json.loads(mock_writer.write.call_args[0][0])
+        assert package['msg']['data'] == {'1': 255, '4': 512}
+
+    async def test_control_fails_fast_in_persistent_mode(self, mock_get_sn):
+        """Test control leaves reconnection to the receive loop."""
+        client = tcp_client("192.168.1.100")
+        client._writer = None  # Start disconnected
+        client._receive_loop_task = MagicMock()
+        client._receive_loop_task.done = MagicMock(return_value=False)
+
+        with patch('asyncio.open_connection') as mock_open:
+            result = await client.control({'1': 255})
+
+        assert result is False
+        mock_open.assert_not_called()
+
     async def test_close_connection(self, mock_tcp_connection):
         """Test connection closing."""
         mock_reader, mock_writer = mock_tcp_connection
@@ -170,6 +325,7 @@ class TestTCPClient:
 
         assert client._writer is None
         assert client._reader is None
+        assert client.is_connected() is False
         # Note: _available is intentionally NOT set to False in _close_connection()
         # to prevent flapping - availability is managed by failure tracking
         assert client._available is True  # Unchanged by _close_connection
@@ -184,11 +340,13 @@ class TestTCPClient:
         package = client._get_package(CMD_SET, payload)
 
         assert isinstance(package, bytes)
-        package_str = package.decode('utf-8')
-        assert '"cmd":3' in package_str
-        assert '"sn":"1234567890"' in package_str
-        assert '"attr":[1,4]' in package_str
-        assert package_str.endswith('\r\n')
+        assert package.endswith(b'\r\n')
+        assert json.loads(package) == {
+            "pv": 0,
+            "cmd": 3,
+            "sn": "1234567890",
+            "msg": {"attr": [1, 4], "data": {"1": 255, "4": 512}},
+        }
 
     async def test_get_package_query_command(self, mock_get_sn):
         """Test package generation for QUERY command."""
@@ -196,9 +354,13 @@ class TestTCPClient:
         
         package = client._get_package(CMD_QUERY, {})
 
-        package_str = package.decode('utf-8')
-        assert '"cmd":2' in package_str
-        assert '"attr":[0]' in package_str
+        assert package.endswith(b'\r\n')
+        assert json.loads(package) == {
+            "pv": 0,
+            "cmd": 2,
+            "sn": "1234567890",
+            "msg": {"attr": [0]},
+        }
 
     async def test_get_package_info_command(self, mock_get_sn):
         """Test package generation for INFO command."""
@@ -206,7 +368,11 @@ class TestTCPClient:
         
         package = client._get_package(CMD_INFO, {})
 
-        package_str = package.decode('utf-8')
-        assert '"cmd":0' in package_str
-        assert '"msg":{}' in package_str
+        assert package.endswith(b'\r\n')
+        assert json.loads(package) == {
+            "pv": 0,
+            "cmd": 0,
+            "sn": "1234567890",
+            "msg": {},
+        }
 
@@ -1,142 +1,105 @@
 """Tests for UDP discovery."""
-import socket
+import asyncio
+import json
+from ipaddress import IPv4Address
 from unittest.mock import MagicMock, patch
 import pytest
 
-from custom_components.hass_cozylife_local_pull.udp_discover import get_ip
+from custom_components.hass_cozylife_local_pull.udp_discover import (
+    _build_discovery_message,
+    async_get_ip,
+)
+
+
+pytestmark = pytest.mark.unit
 
 
-@pytest.mark.unit
 class TestUDPDiscovery:
     """Test UDP discovery functionality."""
 
-    def test_get_ip_success(self, mock_udp_socket):
-        """Test successful UDP discovery."""
-        # Mock socket responses
-        mock_udp_socket.recvfrom = MagicMock(
-            side_effect=[
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # First response (MSG_PEEK)
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # First device
-                (b'{"msg":{}}', ('192.168.1.101', 6095)),  # Second device
-                socket.timeout(),  # Timeout to end collection
-            ]
-        )
-
-        with patch('socket.socket', return_value=mock_udp_socket):
-            result = get_ip()
+    async def test_async_get_ip_success(self, mock_datagram_endpoint):
+        """Test UDP discovery collects every responder."""
+        mock_datagram_endpoint.responses = ['192.168.1.100', '192.168.1.101']
 
-        assert len(result) == 2
-        assert '192.168.1.100' in result
-        assert '192.168.1.101' in result
-        mock_udp_socket.close.assert_called_once()
+        result = await async_get_ip()
 
-    def test_get_ip_no_devices(self, mock_udp_socket):
-        """Test UDP discovery when no devices respond."""
-        # Mock socket to always timeout
-        mock_udp_socket.recvfrom = MagicMock(side_effect=socket.timeout())
+        assert sorted(result) == ['192.168.1.100', '192.168.1.101']
+        mock_datagram_endpoint.transport.close.assert_called_once()
 
-        with patch('socket.socket', return_value=mock_udp_socket):
-            result = get_ip()
+    async def test_async_get_ip_no_devices(self, mock_datagram_endpoint):
+        """Test UDP discovery when no devices respond."""
+        result = await async_get_ip()
 
         assert result == []
-        mock_udp_socket.close.assert_called_once()
+        mock_datagram_endpoint.transport.close.assert_called_once()
 
-    def test_get_ip_duplicate_ips(self, mock_udp_socket):
+    async def test_async_get_ip_duplicate_ips(self, mock_datagram_endpoint):
         """Test that duplicate IPs are filtered."""
-        mock_udp_socket.recvfrom = MagicMock(
-            side_effect=[
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # First response (MSG_PEEK)
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # First device
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # Duplicate
-                (b'{"msg":{}}', ('192.168.1.101', 6095)),  # Second device
-                socket.timeout(),
-            ]
-        )
-
-        with patch('socket.socket', return_value=mock_udp_socket):
-            result = get_ip()
+        mock_datagram_endpoint.responses = [
+            '192.168.1.100', '192.168.1.100', '192.168.1.101',
+        ]
+
+        result = await async_get_ip()
 
         assert len(result) == 2
         assert result.count('192.168.1.100') == 1
 
-    def test_get_ip_socket_error(self, mock_udp_socket):
-        """Test handling of socket errors."""
-        mock_udp_socket.sendto = MagicMock(side_effect=OSError("Network error"))
+    async def test_async_get_ip_send_error(self, mock_datagram_endpoint):
+        """Test that failed broadcasts are logged and discovery still completes."""
+        mock_datagram_endpoint.transport.sendto = MagicMock(side_effect=OSError("Network error"))
 
-        with patch('socket.socket', return_value=mock_udp_socket):
-            result = get_ip()
+        result = await async_get_ip()
 
         assert result == []
-        mock_udp_socket.close.assert_called_once()
-
-    def test_get_ip_consecutive_timeouts(self, mock_udp_socket):
-        """Test that discovery stops after consecutive timeouts."""
-        mock_udp_socket.recvfrom = MagicMock(
-            side_effect=[
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # First response (MSG_PEEK)
-                (b'{"msg":{}}', ('192.168.1.100', 6095)),  # First device
-                socket.timeout(),  # First timeout
-                socket.timeout(),  # Second timeout
-                socket.timeout(),  # Third timeout
-                socket.timeout(),  # Fourth timeout
-                socket.timeout(),  # Fifth timeout - should stop here (MAX_CONSECUTIVE_TIMEOUTS=5)
-                (b'{"msg":{}}', ('192.168.1.101', 6095)),  # This shouldn't be reached
-            ]
-        )
-
-        with patch('socket.socket', return_value=mock_udp_socket):
-            result = get_ip()
-
-        assert len(result) == 1
-        assert '192.168.1.100' in result
-
-    def test_get_ip_broadcast_sent(self, mock_udp_socket):
-        """Test that broadcast messages are sent correctly."""
-        mock_udp_socket.recvfrom = MagicMock(side_effect=socket.timeout())
+        mock_datagram_endpoint.transport.close.assert_called_once()
 
-        with patch('socket.socket', return_value=mock_udp_socket), \
-             patch('custom_components.hass_cozylife_local_pull.udp_discover.get_sn', return_value='123456'):
-            get_ip()
+    async def test_async_get_ip_endpoint_error(self):
+        """Test UDP discovery handles endpoint creation failure."""
+        loop = asyncio.get_running_loop()
+        with patch.object(loop, 'create_datagram_endpoint', side_effect=OSError("Network error")):
+            result = await async_get_ip()
 
-        # Should send 8 broadcast messages (BROADCAST_ATTEMPTS=8)
-        assert mock_udp_socket.sendto.call_count == 8
-        
-        # Check broadcast address
-        for call in mock_udp_socket.sendto.call_args_list:
-            args, kwargs = call
-            assert args[1] == ('255.255.255.255', 6095)
-
-    def test_get_ip_socket_options_set(self, mock_udp_socket):
-        """Test that socket options are set correctly."""
-        mock_udp_socket.recvfrom = MagicMock(side_effect=socket.timeout())
-
-        with patch('socket.socket', return_value=mock_udp_socket):
-            get_ip()
-
-        # Check that socket options were set
-        assert mock_udp_socket.setsockopt.call_count >= 2
-        
-        # Verify SO_REUSEADDR and SO_BROADCAST were set
-        calls = mock_udp_socket.setsockopt.call_args_list
-        so_reuseaddr_set = any(
-            call[0][0] == socket.SOL_SOCKET and call[0][1] == socket.SO_REUSEADDR
-            for call in calls
-        )
-        so_broadcast_set = any(
-            call[0][0] == socket.SOL_SOCKET and call[0][1] == socket.SO_BROADCAST
-            for call in calls
-        )
-        
-        assert so_reuseaddr_set
-        assert so_broadcast_set
-
-    def test_get_ip_timeout_set(self, mock_udp_socket):
-        """Test that socket timeout is set correctly."""
-        mock_udp_socket.recvfrom = MagicMock(side_effect=socket.timeout())
-
-        with patch('socket.socket', return_value=mock_udp_socket):
-            get_ip()
-
-        # Verify timeout was set to 1.0 seconds (SOCKET_TIMEOUT=1.0)
-        mock_udp_socket.settimeout.assert_called_with(1.0)
+        assert result == []
+
+    async def test_async_get_ip_endpoint_options(self, mock_datagram_endpoint):
+        """Test that the endpoint is opened for broadcast on an ephemeral port."""
+        await async_get_ip()
+
+        assert mock_datagram_endpoint.kwargs == {
+            'local_addr': ('0.0.0.0', 0),
+            'allow_broadcast': True,
+        }
 
+    async def test_async_get_ip_broadcast_sent(self, mock_datagram_endpoint):
+        """Test that broadcast messages are sent correctly."""
+        with patch('custom_components.hass_cozylife_local_pull.udp_discover.get_sn', return_value='123456'):
+            await async_get_ip()
+
+        # Should send 8 broadcast messages (BROADCAST_ATTEMPTS=8)
+        sendto = mock_datagram_endpoint.transport.sendto
+        assert sendto.call_count == 8
+        message = b'{"cmd":0,"pv":0,"sn":"123456","msg":{}}'
+        for call in sendto.call_args_list:
+            assert call[0] == (message, ('255.255.255.255', 6095))
+
+    async def test_async_get_ip_broadcasts_per_interface(self, mock_datagram_endpoint):
+        """Test UDP discovery broadcasts on every interface."""
+        with patch(
+            'custom_components.hass_cozylife_local_pull.udp_discover.async_get_ipv4_broadcast_addresses',
+            return_value={IPv4Address('255.255.255.255'), IPv4Address('10.0.0.255')},
+        ):
+            await async_get_ip(MagicMock())
+
+        # 8 attempts to each of the two broadcast addresses
+        sendto = mock_datagram_endpoint.transport.sendto
+        assert sendto.call_count == 16
+        addresses = {call[0][1] for call in sendto.call_args_list}
+        assert addresses == {('255.255.255.255', 6095), ('10.0.0.255', 6095)}
+
+    def test_build_discovery_message(self):
+        """Test the discovery message matches the JSON the devices expect."""
+        with patch('custom_components.hass_cozylife_local_pull.udp_discover.get_sn', return_value='123456'):
+            message = _build_discovery_message()
+
+        expected = {"cmd": 0, "pv": 0, "sn": "123456", "msg": {}}
+        assert message == json.dumps(expected, separators=(",", ":")).encode("utf-8")
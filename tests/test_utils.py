@@ -0,0 +1,183 @@
+"""Tests for utility functions."""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import AsyncMock, patch
+from homeassistant.core import HomeAssistant
+
+from custom_components.hass_cozylife_local_pull import utils
+from custom_components.hass_cozylife_local_pull.const import (
+    CACHE_PID_LIST_PENDING,
+    CACHE_PID_LIST,
+    DOMAIN,
+    PID_LIST_CACHE_TTL,
+    STORAGE_KEY_PID_LIST,
+)
+from custom_components.hass_cozylife_local_pull.utils import async_get_pid_list, get_sn
+
+pytestmark = pytest.mark.unit
+
+
+class TestGetSn:
+    """Test serial number generation."""
+
+    def test_get_sn_is_millisecond_timestamp(self):
+        """Test get_sn returns a 13-digit millisecond timestamp string."""
+        sn = get_sn()
+
+        assert isinstance(sn, str)
+        assert sn.isdigit()
+        assert len(sn) == 13
+
+    def test_get_sn_is_non_decreasing(self):
+        """Test consecutive serial numbers never go backwards."""
+        values = [int(get_sn()) for _ in range(100)]
+
+        assert values == sorted(values)
+
+
+def _api_response(pid_list):
+    """Wrap a product list the way the CozyLife API returns it."""
+    return {"ret": "1", "info": {"list": pid_list}}
+
+
+@pytest.fixture
+def stored_pid_list(hass_storage, mock_pid_list):
+    """Return a helper that seeds the pid list Store with a given age."""
+    def _store(age: float):
+        hass_storage[STORAGE_KEY_PID_LIST] = {
+            "version": 1,
+            "key": STORAGE_KEY_PID_LIST,
+            "data": {"ts": time.time() - age, "list": mock_pid_list},
+        }
+    return _store
+
+
+class TestGetPidListStore:
+    """Test persistence of the product list across restarts."""
+
+    async def test_fresh_store_skips_http(
+        self, hass: HomeAssistant, stored_pid_list, mock_pid_list
+    ):
+        """Test a stored list within the TTL is used without an API call."""
+        stored_pid_list(age=60)
+
+        with patch.object(utils, "_async_request_pid_list", new_callable=AsyncMock) as request:
+            result = await async_get_pid_list(hass)
+
+        assert result == mock_pid_list
+        request.assert_not_called()
+
+    async def test_expired_store_refetches(
+        self, hass: HomeAssistant, stored_pid_list
+    ):
+        """Test a stored list past the TTL is refreshed from the API."""
+        stored_pid_list(age=PID_LIST_CACHE_TTL + 60)
+        fresh = [{"c": "01", "m": []}]
+
+        with patch.object(
+            utils, "_async_request_pid_list", return_value=_api_response(fresh)
+        ) as request:
+            result = await async_get_pid_list(hass)
+
+        assert result == fresh
+        request.assert_called_once()
+
+    async def test_successful_fetch_is_saved(
+        self, hass: HomeAssistant, hass_storage, mock_pid_list
+    ):
+        """Test a fetched list is written to the Store with its timestamp."""
+        with patch.object(
+            utils, "_async_request_pid_list", return_value=_api_response(mock_pid_list)
+        ):
+            await async_get_pid_list(hass)
+            await hass.async_block_till_done()
+
+        data = hass_storage[STORAGE_KEY_PID_LIST]["data"]
+        assert set(data) == {"ts", "list"}
+        assert data["list"] == mock_pid_list
+        assert data["ts"] == pytest.approx(time.time(), abs=60)
+
+    async def test_expired_store_used_when_fetch_fails(
+        self, hass: HomeAssistant, stored_pid_list, mock_pid_list
+    ):
+        """Test an expired stored list is returned when the refresh fails."""
+        stored_pid_list(age=PID_LIST_CACHE_TTL + 60)
+
+        with patch.object(utils, "_async_request_pid_list", return_value=None):
+            result = await async_get_pid_list(hass)
+
+        assert result == mock_pid_list
+        assert hass.data[DOMAIN][CACHE_PID_LIST] == mock_pid_list
+
+
+class TestGetPidListSingleFlight:
+    """Test that concurrent callers share one pid list load."""
+
+    @pytest.fixture
+    def gated_load(self, mock_pid_list):
+        """Patch the loader with one that blocks until released."""
+        release = asyncio.Event()
+
+        async def _load(hass, lang):
+            await release.wait()
+            return mock_pid_list
+
+        with patch.object(utils, "_async_load_pid_list", side_effect=_load) as load:
+            load.release = release
+            yield load
+
+    async def test_concurrent_callers_share_one_load(
+        self, hass: HomeAssistant, gated_load, mock_pid_list
+    ):
+        """Test two concurrent callers trigger exactly one load."""
+        first = asyncio.ensure_future(async_get_pid_list(hass))
+        second = asyncio.ensure_future(async_get_pid_list(hass))
+        await asyncio.sleep(0)
+        gated_load.release.set()
+
+        assert await first == mock_pid_list
+        assert await second == mock_pid_list
+        gated_load.assert_called_once()
+
+    async def test_cancelled_caller_does_not_cancel_load(
+        self, hass: HomeAssistant, gated_load, mock_pid_list
+    ):
+        """Test cancelling one caller leaves the shared load running."""
+        first = asyncio.ensure_future(async_get_pid_list(hass))
+        second = asyncio.ensure_future(async_get_pid_list(hass))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        gated_load.release.set()
+
+        assert await second == mock_pid_list
+        assert first.cancelled()
+        gated_load.assert_called_once()
+
+    async def test_pending_cleared_after_success(
+        self, hass: HomeAssistant, gated_load
+    ):
+        """Test the pending load is forgotten once it completes."""
+        gated_load.release.set()
+
+        await async_get_pid_list(hass)
+        await asyncio.sleep(0)
+
+        assert CACHE_PID_LIST_PENDING not in hass.data[DOMAIN]
+
+    async def test_pending_cleared_after_failure(self, hass: HomeAssistant):
+        """Test a failed load is forgotten so the next call retries."""
+        with patch.object(
+            utils, "_async_load_pid_list", side_effect=RuntimeError("boom")
+        ) as load:
+            with pytest.raises(RuntimeError):
+                await async_get_pid_list(hass)
+            await asyncio.sleep(0)
+
+            assert CACHE_PID_LIST_PENDING not in hass.data[DOMAIN]
+            with pytest.raises(RuntimeError):
+                await async_get_pid_list(hass)
+
+        assert load.call_count == 2